@@ -0,0 +1,27 @@
+# Times style() on deeply nested documents, where descendant selectors are rejected with
+# the ancestor tag counts instead of walking up the tree.
+# tests/test_CSSParser.py checks that both ways match the same nodes.
+# Run from src/: PYTHONPATH=.. python benchmarks/AncestorFilterBenchmark.py [depths...]
+import gc
+import sys
+import time
+
+from src.benchmarks.Documents import INLINE_TAGS, deep_document, stylesheet
+from src.dom.HTMLParser import HTMLParser
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.RuleIndex import RuleIndex
+
+
+def main(depths: list[int]) -> None:
+    rules = RuleIndex(sorted(CSSParser(stylesheet(1000)).parse(), key=cascade_priority))
+    print("{:>8}{:>16}".format("depth", "style"))
+    for depth in depths:
+        root = HTMLParser(deep_document(depth, tags=["div", "p", "ul", "li"] + INLINE_TAGS)).parse()
+        gc.collect()
+        start = time.perf_counter()
+        style(root, rules, force=True)
+        print("{:>8}{:>14.1f}ms".format(depth, (time.perf_counter() - start) * 1000))
+
+
+if __name__ == "__main__":
+    main([int(depth) for depth in sys.argv[1:]] or [100, 200, 500, 1000])
@@ -0,0 +1,26 @@
+# Times CSSParser on large generated stylesheets. tests/test_CSSParser.py checks the results.
+# Run from src/: PYTHONPATH=.. python benchmarks/CSSParserBenchmark.py [size in KB]
+import sys
+import time
+
+from src.benchmarks.Documents import stylesheet
+from src.styling.CSSParser import CSSParser
+
+
+def main(size: int) -> None:
+    css = ""
+    seed = 0
+    while len(css) < size * 1024:
+        css += stylesheet(500, seed) + "\n"
+        seed += 1
+    print("{}KB of css".format(len(css) // 1024))
+    times = []
+    for _ in range(5):
+        start = time.perf_counter()
+        rules = CSSParser(css).parse()
+        times.append(time.perf_counter() - start)
+    print("{:<20}{:>10.1f}ms  {} rules".format("CSSParser", min(times) * 1000, len(rules)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,94 @@
+# Reports the memory used per DOM node with the __slots__ based Element/Text
+# and with dict based classes holding the same fields, including the text and attribute strings.
+# Run from src/: PYTHONPATH=.. python benchmarks/DOMMemoryBenchmark.py [size in MB]
+import gc
+import sys
+import tracemalloc
+
+import src.dom.HTMLParser as parser_module
+from src.benchmarks.Documents import prose_document
+from src.dom.HTMLParser import HTMLParser
+
+
+class DictElement:
+    # Element before it used __slots__
+    def __init__(self, tag, attributes, parent):
+        self.tag = tag
+        self.attributes = attributes
+        self.children = []
+        self.parent = parent
+        self.style = {}
+        self.is_focused = False
+        self.style_dirty = True
+        self.children_style_dirty = True
+        self.layout_dirty = True
+
+
+class DictText:
+    # Text before it used __slots__
+    def __init__(self, text, parent):
+        self.text = text
+        self.children = []
+        self.parent = parent
+        self.style = {}
+        self.is_focused = False
+        self.style_dirty = True
+        self.layout_dirty = True
+
+
+class DictHTMLParser(HTMLParser):
+    # get_attributes without interning
+    def get_attributes(self, text: str) -> tuple[str, dict[str, str]]:
+        parts = text.split()
+        tag = parts[0].casefold()
+        attributes = {}
+        for attrpair in parts[1:]:
+            if "=" in attrpair:
+                key, value = attrpair.split("=", 1)
+                if len(value) > 2 and value[0] in ["'", "\""]:
+                    value = value[1:-1]
+                attributes[key.casefold()] = value
+            else:
+                attributes[attrpair.casefold()] = ""
+        return tag, attributes
+
+
+def count_nodes(root) -> int:
+    count = 0
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        count += 1
+        stack.extend(node.children)
+    return count
+
+
+def measure(parse, body: str) -> tuple[int, int]:
+    gc.collect()
+    tracemalloc.start()
+    root = parse(body)
+    used, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return used, count_nodes(root)
+
+
+def parse_with_dict_nodes(body: str):
+    element, text = parser_module.Element, parser_module.Text
+    parser_module.Element, parser_module.Text = DictElement, DictText
+    try:
+        return DictHTMLParser(body).parse()
+    finally:
+        parser_module.Element, parser_module.Text = element, text
+
+
+def main(size: float) -> None:
+    body = prose_document(int(size * 1024 * 1024))
+    before, nodes = measure(parse_with_dict_nodes, body)
+    after, same_nodes = measure(lambda b: HTMLParser(b).parse(), body)
+    print("{} nodes from {:.1f}MB of html".format(nodes, size))
+    print("{:<22}{:>10.1f} bytes/node".format("dict based nodes", before / nodes))
+    print("{:<22}{:>10.1f} bytes/node".format("__slots__ nodes", after / same_nodes))
+
+
+if __name__ == "__main__":
+    main(float(sys.argv[1]) if len(sys.argv) > 1 else 2)
@@ -0,0 +1,43 @@
+# Times style, layout and paint on documents nested up to 100k levels deep, headless with
+# fixed-advance fonts and Python's default recursion limit, which they used to run into.
+# tests/test_Traversal.py checks deep documents at a smaller depth.
+# Run from src/: PYTHONPATH=.. python benchmarks/DeepDocumentBenchmark.py [depths...]
+import gc
+import sys
+import time
+
+from src.benchmarks.Documents import deep_document
+from src.dom.HTMLParser import HTMLParser
+from src.layout.DocumentLayout import DocumentLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.Fonts import set_font_provider
+from src.styling.RuleIndex import RuleIndex
+from src.styling.TableFont import TableFontProvider
+from src.user_agent.Utils import paint_tree
+
+
+def main(depths: list[int]) -> None:
+    set_font_provider(TableFontProvider.fixed())
+    rules = RuleIndex(sorted(CSSParser(open("user_agent/browser.css").read()).parse(), key=cascade_priority))
+    print("recursion limit {}".format(sys.getrecursionlimit()))
+    print("{:>8}{:>12}{:>12}{:>12}{:>12}".format("depth", "style", "layout", "paint", "commands"))
+    for depth in depths:
+        for tags in (["div"], ["div", "span", "b", "p"]):  # nested blocks and nested inline content
+            root = HTMLParser(deep_document(depth, tags=tags)).parse()
+            gc.collect()
+            start = time.perf_counter()
+            style(root, rules, force=True)
+            styled = time.perf_counter()
+            document = DocumentLayout(root)
+            document.layout()
+            laid_out = time.perf_counter()
+            display_list = []
+            paint_tree(document, display_list)
+            painted = time.perf_counter()
+            print("{:>8}{:>10.0f}ms{:>10.0f}ms{:>10.0f}ms{:>12}  {}".format(
+                depth, (styled - start) * 1000, (laid_out - styled) * 1000, (painted - laid_out) * 1000,
+                len(display_list), "/".join(tags)))
+
+
+if __name__ == "__main__":
+    main([int(depth) for depth in sys.argv[1:]] or [1000, 10000, 100000])
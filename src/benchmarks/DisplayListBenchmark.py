@@ -0,0 +1,69 @@
+# Times finding the commands to draw for every scroll position of a long page with the
+# DisplayListIndex, and updating the index after a one word change against building it from
+# scratch. tests/test_DisplayListIndex.py checks the results.
+# Run from src/: PYTHONPATH=.. python benchmarks/DisplayListBenchmark.py [size in KB]
+import random
+import sys
+import time
+
+from src.benchmarks.Documents import prose_document
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Traversal import of_type
+from src.drawing.DisplayListIndex import DisplayListIndex
+from src.layout.DocumentLayout import DocumentLayout
+from src.layout.TextLayout import TextLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.Fonts import set_font_provider
+from src.styling.RuleIndex import RuleIndex
+from src.styling.TableFont import TableFontProvider
+from src.user_agent.Constants import HEIGHT, SCROLL_STEP
+from src.user_agent.Utils import paint_tree
+
+
+def paint(document) -> list:
+    display_list = []
+    paint_tree(document, display_list)
+    return display_list
+
+
+def main(size: int) -> None:
+    set_font_provider(TableFontProvider.fixed())
+    rules = CSSParser(open("user_agent/browser.css").read()).parse()
+    root = HTMLParser(prose_document(size * 1024)).parse()
+    style(root, RuleIndex(sorted(rules, key=cascade_priority)))
+    document = DocumentLayout(root)
+    document.layout()
+
+    index = DisplayListIndex(HEIGHT)
+    display_list = paint(document)
+    index.update(display_list)
+    scrolls = range(0, int(document.height), SCROLL_STEP)
+    print("{} commands, {} scroll positions".format(len(display_list), len(scrolls)))
+
+    start = time.perf_counter()
+    for scroll in scrolls:
+        index.visible(scroll, scroll + HEIGHT)
+    index_time = time.perf_counter() - start
+    print("{:<24}{:>10.3f}ms per frame".format("index", index_time / len(scrolls) * 1000))
+
+    # change one word at a time, the new display list only differs in that command
+    rng = random.Random(0)
+    words = list(of_type(document, TextLayout))
+    update_time = rebuild_time = 0
+    for _ in range(20):
+        word = rng.choice(words)
+        word.word = word.word[::-1]  # same width with fixed advance fonts
+        display_list = paint(document)  # unchanged layout objects paint the same commands
+        start = time.perf_counter()
+        index.update(display_list)
+        update_time += time.perf_counter() - start
+        start = time.perf_counter()
+        fresh = DisplayListIndex(HEIGHT)
+        fresh.update(display_list)
+        rebuild_time += time.perf_counter() - start
+    print("{:<24}{:>10.3f}ms".format("update after a change", update_time / 20 * 1000))
+    print("{:<24}{:>10.3f}ms".format("build from scratch", rebuild_time / 20 * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
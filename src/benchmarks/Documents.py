@@ -0,0 +1,105 @@
+# Generated html documents for the benchmarks, always the same for the same arguments.
+import random
+
+from src.dom.Element import Element
+from src.dom.Text import Text
+
+WORDS = ("lorem ipsum dolor sit amet consectetur adipiscing elit sed do eiusmod tempor "
+         "incididunt ut labore et dolore magna aliqua enim ad minim veniam quis nostrud").split()
+INLINE_TAGS = ["b", "i", "a", "small", "big", "span"]
+
+
+def words(rng: random.Random, count: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(count))
+
+
+def paragraph(rng: random.Random) -> str:
+    out = "<p>"
+    for _ in range(rng.randint(3, 8)):
+        tag = rng.choice(INLINE_TAGS)
+        attributes = ' href="/page{}.html"'.format(rng.randint(0, 99)) if tag == "a" else ""
+        out += "{} <{}{}>{}</{}> ".format(words(rng, rng.randint(3, 12)), tag, attributes,
+                                           words(rng, rng.randint(1, 4)), tag)
+    return out + "</p>\n"
+
+
+# long prose with sections, headings and inline markup
+def prose_document(size: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = ["<!doctype html><html><head><title>Generated</title>"
+             "<link rel=stylesheet href=style.css></head><body>\n"]
+    length = len(parts[0])
+    while length < size:
+        part = "<div class=section><h2>{}</h2>\n".format(words(rng, 4))
+        for _ in range(rng.randint(2, 6)):
+            part += paragraph(rng)
+        part += "</div>\n"
+        parts.append(part)
+        length += len(part)
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# nested elements (divs unless other tags are given), each level with a bit of text
+def deep_document(depth: int, seed: int = 0, tags: list[str] | None = None) -> str:
+    rng = random.Random(seed)
+    tags = [rng.choice(tags or ["div"]) for _ in range(depth)]
+    return "<html><body>" + \
+        "".join("<{}>{} ".format(tag, words(rng, 2)) for tag in tags) + \
+        "".join("</{}>".format(tag) for tag in reversed(tags)) + "</body></html>"
+
+
+# flat list of many siblings
+def wide_document(width: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    return "<html><body><ul>" + \
+        "".join("<li>{}</li>".format(words(rng, 3)) for _ in range(width)) + \
+        "</ul></body></html>"
+
+
+# many small forms with text inputs and buttons
+def forms_document(count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    parts = ["<html><body>"]
+    for i in range(count):
+        parts.append("<form action=/submit{} method=post><p>{}</p>".format(i, words(rng, 6)))
+        for j in range(rng.randint(1, 4)):
+            parts.append("<p>{}: <input name=field{} value={}> {}</p>".format(
+                words(rng, 1), j, rng.choice(WORDS), words(rng, 3)))
+        parts.append("<p><button>{}</button></p></form>".format(words(rng, 1)))
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+# nested tuples of tags, attributes and texts, for comparing two parse results
+def tree_signature(root: Element | Text) -> list:
+    signature = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Text):
+            signature.append(("text", node.text, node.parent.tag if node.parent else None))
+        else:
+            signature.append((node.tag, sorted(node.attributes.items()),
+                              node.parent.tag if node.parent else None, len(node.children)))
+        stack.extend(reversed(node.children))
+    return signature
+
+
+# many rules over the tags of the generated documents plus tags that never appear
+def stylesheet(count: int, seed: int = 0) -> str:
+    rng = random.Random(seed)
+    tags = ["html", "body", "div", "p", "h2", "ul", "li"] + INLINE_TAGS + \
+        ["tag{}".format(i) for i in range(200)]
+    properties = [("color", ["red", "green", "blue", "black"]),
+                  ("font-weight", ["bold", "normal"]),
+                  ("font-style", ["italic", "normal"]),
+                  ("background-color", ["yellow", "gray", "transparent"]),
+                  ("font-size", ["12px", "16px", "90%", "110%"])]
+    out = []
+    for _ in range(count):
+        selector = " ".join(rng.choice(tags) for _ in range(rng.randint(1, 3)))
+        body = " ".join("{}: {};".format(name, rng.choice(values))
+                        for name, values in rng.sample(properties, rng.randint(1, 3)))
+        out.append("{} {{ {} }}".format(selector, body))
+    return "\n".join(out)
@@ -0,0 +1,60 @@
+# Times layout of a long text page with and without the word width cache.
+# Needs a display for Tk.
+# Run from src/: PYTHONPATH=.. python benchmarks/FontMeasureBenchmark.py [size in KB]
+import gc
+import sys
+import time
+import tkinter
+import tkinter.font
+
+import src.styling.TkFont as TkFont
+from src.benchmarks.Documents import prose_document
+from src.dom.HTMLParser import HTMLParser
+from src.layout.DocumentLayout import DocumentLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.RuleIndex import RuleIndex
+from src.user_agent.Utils import paint_tree
+
+TK_MEASURE = tkinter.font.Font.measure
+
+
+def count_tk_calls() -> list[int]:
+    calls = [0]
+
+    def measure(font, text, displayof=None):
+        calls[0] += 1
+        return TK_MEASURE(font, text, displayof)
+
+    tkinter.font.Font.measure = measure
+    return calls
+
+
+def measure(root, cache_size: int) -> tuple[float, int]:
+    TkFont.MEASURE_CACHE_SIZE = cache_size
+    TkFont.MEASUREMENTS.clear()
+    calls = count_tk_calls()
+    gc.collect()
+    start = time.perf_counter()
+    document = DocumentLayout(root)
+    document.layout()
+    paint_tree(document, [])  # DrawText measures the words once more
+    return time.perf_counter() - start, calls[0]
+
+
+def main(size: int) -> None:
+    window = tkinter.Tk()
+    window.withdraw()
+    rules = CSSParser(open("user_agent/browser.css").read()).parse()
+    root = HTMLParser(prose_document(size * 1024)).parse()
+    style(root, RuleIndex(sorted(rules, key=cascade_priority)))
+
+    print("{:<14}{:>14}{:>14}".format("", "layout+paint", "Tk measures"))
+    for name, cache_size in [("no cache", 0), ("cache", 100_000)]:
+        elapsed, calls = measure(root, cache_size)
+        print("{:<14}{:>12.0f}ms{:>14}".format(name, elapsed * 1000, calls))
+    tkinter.font.Font.measure = TK_MEASURE
+    window.destroy()
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 200)
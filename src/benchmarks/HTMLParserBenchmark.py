@@ -0,0 +1,64 @@
+# Times the chunked HTMLParser against the previous character-by-character parser, on whole
+# documents and on the same documents fed in 64KB chunks.
+# tests/test_HTMLParser.py checks the trees they build.
+# Run from src/: PYTHONPATH=.. python benchmarks/HTMLParserBenchmark.py [sizes in MB...]
+import gc
+import sys
+import time
+
+from src.benchmarks.Documents import prose_document
+from src.dom.Element import Element
+from src.dom.HTMLParser import HTMLParser
+
+CHUNK_SIZE = 64 * 1024
+
+
+class CharacterHTMLParser(HTMLParser):
+    # the tokenizer HTMLParser had before it accepted chunks
+    def parse(self) -> Element:
+        token = ""
+        in_tag = False
+        for c in self.body:
+            if c == "<":
+                in_tag = True
+                if token:
+                    self.add_text(token)
+                token = ""
+            elif c == ">":
+                in_tag = False
+                self.add_tag(token)
+                token = ""
+            else:
+                token += c
+        if not in_tag and token:
+            self.add_text(token)
+        return self.finish()
+
+
+def parse_chunked(body: str) -> Element:
+    parser = HTMLParser()
+    for i in range(0, len(body), CHUNK_SIZE):
+        parser.feed(body[i:i + CHUNK_SIZE])
+    return parser.close()
+
+
+def measure(parse, body: str) -> float:
+    gc.collect()  # don't charge the previous tree to this run
+    start = time.perf_counter()
+    parse(body)
+    return time.perf_counter() - start
+
+
+def main(sizes: list[float]) -> None:
+    print("{:>8}{:>16}{:>16}{:>16}".format("size", "per character", "whole string", "64KB chunks"))
+    for size in sizes:
+        body = prose_document(int(size * 1024 * 1024))
+        old_time = measure(lambda b: CharacterHTMLParser(b).parse(), body)
+        whole_time = measure(lambda b: HTMLParser(b).parse(), body)
+        chunked_time = measure(parse_chunked, body)
+        print("{:>6}MB{:>14.0f}ms{:>14.0f}ms{:>14.0f}ms".format(
+            size, old_time * 1000, whole_time * 1000, chunked_time * 1000))
+
+
+if __name__ == "__main__":
+    main([float(size) for size in sys.argv[1:]] or [1, 10])
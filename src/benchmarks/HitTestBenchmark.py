@@ -0,0 +1,40 @@
+# Times finding the clicked layout object with hit_test on a long page.
+# tests/test_Utils.py checks what it finds.
+# Run from src/: PYTHONPATH=.. python benchmarks/HitTestBenchmark.py [size in KB]
+import random
+import sys
+import time
+
+from src.benchmarks.Documents import prose_document
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Traversal import pre_order
+from src.layout.DocumentLayout import DocumentLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.Fonts import set_font_provider
+from src.styling.RuleIndex import RuleIndex
+from src.styling.TableFont import TableFontProvider
+from src.user_agent.Utils import hit_test
+
+
+def main(size: int, clicks: int = 200) -> None:
+    set_font_provider(TableFontProvider.fixed())
+    rules = CSSParser(open("user_agent/browser.css").read()).parse()
+    root = HTMLParser(prose_document(size * 1024)).parse()
+    style(root, RuleIndex(sorted(rules, key=cascade_priority)))
+    document = DocumentLayout(root)
+    document.layout()
+
+    rng = random.Random(0)
+    points = [(rng.uniform(0, 800), rng.uniform(0, document.height)) for _ in range(clicks)]
+
+    start = time.perf_counter()
+    for x, y in points:
+        hit_test(document, x, y)
+    hit_test_time = time.perf_counter() - start
+
+    print("{} layout objects".format(sum(1 for obj in pre_order(document))))
+    print("{:<16}{:>10.3f}ms per click".format("hit_test", hit_test_time / clicks * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500)
@@ -0,0 +1,31 @@
+# Times HTMLParser on deep and wide documents, where implicit_tags used to look at every
+# open tag for every token. tests/test_HTMLParser.py checks the trees it builds.
+# Run from src/: PYTHONPATH=.. python benchmarks/ImplicitTagsBenchmark.py
+import gc
+import time
+
+from src.benchmarks.Documents import deep_document, prose_document, wide_document
+from src.dom.HTMLParser import HTMLParser
+
+
+def measure(body: str) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    HTMLParser(body).parse()
+    return time.perf_counter() - start
+
+
+def main() -> None:
+    documents = {
+        "deep 1000": deep_document(1000),
+        "deep 5000": deep_document(5000),
+        "wide 50000": wide_document(50000),
+        "prose 1MB": prose_document(1024 * 1024),
+    }
+    print("{:<14}{:>14}".format("document", "parse"))
+    for name, body in documents.items():
+        print("{:<14}{:>12.0f}ms".format(name, measure(body) * 1000))
+
+
+if __name__ == "__main__":
+    main()
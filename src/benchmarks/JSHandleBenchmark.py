@@ -0,0 +1,58 @@
+# Runs a script that keeps rewriting part of a page with innerHTML and adds listeners to the
+# new nodes, and reports live handles, listener entries and memory afterwards.
+# tests/test_JSContext.py checks which handles and listeners are released.
+# Run from src/: PYTHONPATH=..:user_agent python benchmarks/JSHandleBenchmark.py [rounds] [items]
+import gc
+import os
+import sys
+import tempfile
+import tracemalloc
+
+from URL import URL
+from src.styling.Fonts import set_font_provider
+from src.styling.TableFont import TableFontProvider
+from Tab import Tab
+
+PAGE = "<html><body><div><p>start</p></div><p>footer</p></body></html>"
+SCRIPT = """
+var container = document.querySelectorAll("div")[0];
+var html = "";
+for (var i = 0; i < {items}; i++) html += "<p><button>item " + i + "</button></p>";
+for (var round = 0; round < {rounds}; round++) {{
+    container.innerHTML = html;
+    var buttons = document.querySelectorAll("button");
+    for (var j = 0; j < buttons.length; j++) {{
+        buttons[j].addEventListener("click", function (e) {{ e.preventDefault(); }});
+    }}
+}}
+Object.keys(LISTENERS).length
+"""
+
+
+def run(path: str, rounds: int, items: int) -> tuple[int, int, int]:
+    tab = Tab(600)
+    tab.load(URL("file://" + path))
+    gc.collect()
+    tracemalloc.start()
+    listeners = tab.js.run("benchmark", SCRIPT.format(rounds=rounds, items=items))
+    gc.collect()
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return tab.js.live_handles(), listeners, memory
+
+
+def main(rounds: int, items: int) -> None:
+    set_font_provider(TableFontProvider.fixed())
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "page.html")
+        with open(path, "w") as f:
+            f.write(PAGE)
+        print("{} rounds of {} buttons".format(rounds, items))
+        print("{:>14}{:>14}{:>14}".format("live handles", "listeners", "python heap"))
+        handles, listeners, memory = run(path, rounds, items)
+        print("{:>14}{:>14}{:>12.0f}kB".format(handles, listeners, memory / 1024))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 100,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 50)
@@ -0,0 +1,49 @@
+# Times querySelectorAll from scripts with the tag index and selector cache, while innerHTML
+# replaces parts of the document. tests/test_JSContext.py checks the nodes it finds.
+# Run from src/: PYTHONPATH=..:user_agent python benchmarks/QuerySelectorBenchmark.py [forms] [queries]
+import os
+import random
+import sys
+import tempfile
+import time
+
+from URL import URL
+from src.benchmarks.Documents import forms_document
+from src.dom.Traversal import elements
+from src.styling.Fonts import set_font_provider
+from src.styling.TableFont import TableFontProvider
+from Tab import Tab
+
+SELECTORS = ["input", "form", "button", "form input", "body form button", "p", "strong", "div p b"]
+FRAGMENTS = ["<p>plain <b>text</b></p>", "<form><input name=a><input name=b><button>go</button></form>",
+             "", "<strong>warning</strong> <div><p>x <b>y</b></p></div>"]
+
+
+def main(forms: int, queries: int) -> None:
+    set_font_provider(TableFontProvider.fixed())
+    rng = random.Random(0)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "forms.html")
+        with open(path, "w") as f:
+            f.write(forms_document(forms))
+        tab = Tab(600)
+        tab.load(URL("file://" + path))
+
+    query_time = 0.0
+    for i in range(queries):
+        if i % 20 == 0:  # a script rewrites part of the page
+            target = rng.choice(list(elements(tab.nodes, "form", "p", "div", "strong")))
+            handle = tab.js.get_handle(target)
+            tab.js.innerHTML_set(handle, rng.choice(FRAGMENTS))
+        selector_text = rng.choice(SELECTORS)
+        start = time.perf_counter()
+        tab.js.querySelectorAll(selector_text)
+        query_time += time.perf_counter() - start
+
+    print("{} elements, {} queries".format(len(tab.js.dom_index), queries))
+    print("{:<22}{:>10.3f}ms per query".format("querySelectorAll", query_time / queries * 1000))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 500,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 400)
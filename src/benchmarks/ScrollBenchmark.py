@@ -0,0 +1,99 @@
+# Frame times for scrolling a long page down and up again: deleting and creating every visible
+# canvas item per frame like Browser.draw did, next to Tab.draw, which keeps the items and moves them.
+# Uses a real Tk canvas with --tk (needs a display). Otherwise a RecordingCanvas counts the calls
+# a Tk canvas would get, and the frame times are only the Python side of drawing.
+# tests/test_Tab.py checks that the retained items show what a full redraw would.
+# Run from src/: PYTHONPATH=..:user_agent python benchmarks/ScrollBenchmark.py [--tk] [size in KB]
+import os
+import sys
+import tempfile
+import time
+
+from Constants import HEIGHT, SCROLL_STEP
+from Tab import Tab
+from URL import URL
+from src.benchmarks.Documents import prose_document
+from src.drawing.RecordingCanvas import RecordingCanvas
+from src.styling.Fonts import set_font_provider
+from src.styling.TableFont import TableFontProvider
+
+
+def redraw(tab: Tab, canvas) -> None:
+    canvas.delete("all")
+    for cmd in tab.display_list:
+        if cmd.rect.top > tab.scroll + tab.tab_height:
+            continue
+        if cmd.rect.bottom < tab.scroll:
+            continue
+        cmd.execute(tab.scroll, canvas)
+
+
+def retained(tab: Tab, canvas) -> None:
+    tab.draw(canvas, 0)
+
+
+def scroll(tab: Tab, canvas, draw, flush) -> list[float]:
+    positions = list(range(0, int(tab.document.height), SCROLL_STEP))
+    frames = []
+    for position in positions + positions[::-1]:
+        start = time.perf_counter()
+        tab.scroll = position
+        draw(tab, canvas)
+        flush()
+        frames.append(time.perf_counter() - start)
+    return frames
+
+
+def percentile(frames: list[float], p: float) -> float:
+    return sorted(frames)[min(int(len(frames) * p), len(frames) - 1)]
+
+
+def main(args: list[str]) -> None:
+    use_tk = "--tk" in args
+    args = [arg for arg in args if arg != "--tk"]
+    size = int(args[0]) if args else 300
+
+    if use_tk:
+        import tkinter
+        window = tkinter.Tk()
+        flush = window.update
+    else:
+        set_font_provider(TableFontProvider.fixed())
+        flush = lambda: None
+
+    with tempfile.NamedTemporaryFile("w", suffix=".html", delete=False) as f:
+        f.write(prose_document(size * 1024))
+    tab = Tab(HEIGHT, scripts=False)
+    tab.load(URL("file://" + f.name))
+    os.unlink(f.name)
+    print("{} commands, page height {:.0f}px".format(len(tab.display_list), tab.document.height))
+
+    series = {}
+    calls = {}
+    for name, draw in [("delete all", redraw), ("retained", retained)]:
+        if use_tk:
+            canvas = tkinter.Canvas(window, width=800, height=HEIGHT, bg="white")
+            canvas.pack()
+        else:
+            canvas = RecordingCanvas()
+        tab.forget_canvas()
+        series[name] = scroll(tab, canvas, draw, flush)
+        calls[name] = canvas.calls / len(series[name]) if not use_tk else None
+        if use_tk:
+            canvas.destroy()
+
+    if not use_tk:
+        print("RecordingCanvas, the times are Python drawing time only")
+    print("{:<18}{:>14}{:>14}".format("", *series))
+    rows = [("mean frame", lambda frames: sum(frames) / len(frames)),
+            ("median frame", lambda frames: percentile(frames, 0.5)),
+            ("95% frame", lambda frames: percentile(frames, 0.95)),
+            ("worst frame", max)]
+    for row, summary in rows:
+        print("{:<18}{:>12.3f}ms{:>12.3f}ms".format(row, *(summary(frames) * 1000 for frames in series.values())))
+    if not use_tk:
+        print("{:<18}{:>14.1f}{:>14.1f}".format("canvas calls/frame", *calls.values()))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
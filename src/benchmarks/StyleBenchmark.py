@@ -0,0 +1,30 @@
+# Times style() with large generated stylesheets on a large document.
+# tests/test_CSSParser.py checks which rules the index gives for a node.
+# Run from src/: PYTHONPATH=.. python benchmarks/StyleBenchmark.py [rule counts...]
+import gc
+import sys
+import time
+
+from src.benchmarks.Documents import prose_document, stylesheet
+from src.dom.HTMLParser import HTMLParser
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.RuleIndex import RuleIndex
+
+
+def measure(root, rules: RuleIndex) -> float:
+    gc.collect()
+    start = time.perf_counter()
+    style(root, rules, force=True)
+    return time.perf_counter() - start
+
+
+def main(counts: list[int]) -> None:
+    root = HTMLParser(prose_document(1024 * 1024)).parse()
+    print("{:>8}{:>16}".format("rules", "style"))
+    for count in counts:
+        rules = sorted(CSSParser(stylesheet(count)).parse(), key=cascade_priority)
+        print("{:>8}{:>14.0f}ms".format(count, measure(root, RuleIndex(rules)) * 1000))
+
+
+if __name__ == "__main__":
+    main([int(count) for count in sys.argv[1:]] or [100, 1000, 3000])
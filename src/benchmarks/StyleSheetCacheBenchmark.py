@@ -0,0 +1,85 @@
+# Loads pages that share the same stylesheets into new tabs, once parsing and sorting every
+# stylesheet and style attribute again for every page and once with the shared caches.
+# tests/test_StyleSheetCache.py checks that both give the same computed styles.
+# Run from src/: PYTHONPATH=..:user_agent python benchmarks/StyleSheetCacheBenchmark.py [pages] [rules]
+import gc
+import os
+import random
+import sys
+import tempfile
+
+from Tab import Tab
+from URL import URL
+from src.benchmarks.Documents import prose_document, stylesheet
+from src.styling import CSSParser
+from src.styling.Fonts import set_font_provider
+from src.styling.StyleSheetCache import CASCADE_CACHE_SIZE, STYLE_SHEET_CACHE, STYLE_SHEET_CACHE_SIZE
+from src.styling.TableFont import TableFontProvider
+
+SHEETS = ["style.css", "theme.css", "print.css"]
+INLINE_STYLES = ["color: blue;", "font-weight: bold; color: gray;", "font-size: 110%;",
+                 "background-color: yellow; font-style: italic;"]
+
+
+def write_site(directory: str, pages: int, rules: int) -> list[str]:
+    for seed, name in enumerate(SHEETS):
+        with open(os.path.join(directory, name), "w") as f:
+            f.write(stylesheet(rules, seed))
+    links = "".join("<link rel=stylesheet href={}>".format(name) for name in SHEETS[1:])
+    paths = []
+    for page in range(pages):
+        rng = random.Random(page)
+        html = prose_document(50 * 1024, seed=page).replace("</head>", links + "</head>")
+        parts = html.split("<p>")
+        html = parts[0] + "".join('<p style="{}">'.format(rng.choice(INLINE_STYLES)) + part
+                                  for part in parts[1:])
+        path = os.path.join(directory, "page{}.html".format(page))
+        with open(path, "w") as f:
+            f.write(html)
+        paths.append(path)
+    return paths
+
+
+def load_all(paths: list[str]) -> dict[str, float]:
+    totals = {"subresources": 0.0, "style": 0.0}
+    for path in paths:
+        gc.collect()
+        tab = Tab(600, scripts=False)  # a new tab for every page, only the caches are shared
+        tab.load(URL("file://" + path))
+        for phase in totals:
+            totals[phase] += tab.timings[phase]
+    return totals
+
+
+def main(pages: int, rules: int) -> None:
+    set_font_provider(TableFontProvider.fixed())
+    with tempfile.TemporaryDirectory() as directory:
+        paths = write_site(directory, pages, rules)
+
+        inline_cache_size = CSSParser.INLINE_STYLE_CACHE_SIZE
+        STYLE_SHEET_CACHE.max_sheets = STYLE_SHEET_CACHE.max_cascades = 0
+        CSSParser.INLINE_STYLE_CACHE_SIZE = 0
+        STYLE_SHEET_CACHE.clear()
+        CSSParser.INLINE_STYLES.clear()
+        before = load_all(paths)
+
+        STYLE_SHEET_CACHE.max_sheets = STYLE_SHEET_CACHE_SIZE
+        STYLE_SHEET_CACHE.max_cascades = CASCADE_CACHE_SIZE
+        CSSParser.INLINE_STYLE_CACHE_SIZE = inline_cache_size
+        STYLE_SHEET_CACHE.clear()
+        after = load_all(paths)
+
+    print("{} pages, {} stylesheets with {} rules each, {} distinct style attributes".format(
+        pages, len(SHEETS), rules, len(INLINE_STYLES)))
+    print("{:<16}{:>12}{:>12}".format("per page", "no cache", "cache"))
+    for phase in before:
+        print("{:<16}{:>10.1f}ms{:>10.1f}ms".format(
+            phase, before[phase] / pages * 1000, after[phase] / pages * 1000))
+    saved = sum(before.values()) - sum(after.values())
+    print("saved {:.1f}ms per page, {} of {} stylesheet loads were cache hits".format(
+        saved / pages * 1000, STYLE_SHEET_CACHE.hits, STYLE_SHEET_CACHE.hits + STYLE_SHEET_CACHE.misses))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         int(sys.argv[2]) if len(sys.argv) > 2 else 2000)
@@ -0,0 +1,71 @@
+# Times loading a page with many scripts and stylesheets from server/Webserver.py,
+# once with sequential downloads and once with parallel ones. The server lets the browser
+# cache scripts and stylesheets, so the http cache is cleared before each run.
+# Run from src/: PYTHONPATH=..:user_agent python benchmarks/SubresourceBenchmark.py [count] [delay]
+import sys
+import threading
+import time
+
+from Constants import MAX_INFLIGHT_PER_ORIGIN
+from Fetcher import Fetcher
+from HTTPCache import HTTP_CACHE
+from URL import URL
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Traversal import elements
+from src.server import Webserver
+from src.styling.CSSParser import CSSParser
+
+PORT = 8001
+
+
+def load(url: URL, fetcher: Fetcher) -> dict[str, float]:
+    timings = {}
+    start = time.perf_counter()
+    headers, body = url.request(None)
+    timings["page request"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    nodes = HTMLParser(body).parse()
+    timings["html parse"] = time.perf_counter() - start
+
+    # same order of work as Tab.load: start everything, then consume in document order
+    start = time.perf_counter()
+    sources = [node.attributes.get("src") or node.attributes.get("href")
+               for node in elements(nodes, "script", "link")]
+    downloads = [fetcher.fetch(url.resolve(src), url) for src in sources]
+    bodies = [future.result()[1] for future in downloads]
+    timings["subresource fetch"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for src, body in zip(sources, bodies):
+        if src.endswith(".css"):
+            CSSParser(body).parse()
+    timings["css parse"] = time.perf_counter() - start
+    return timings
+
+
+def main(count: int, delay: float) -> None:
+    server = threading.Thread(target=Webserver.serve, args=(PORT, delay, False), daemon=True)
+    server.start()
+    time.sleep(0.2)  # give the server time to bind
+
+    url = URL("http://localhost:{}/subresources/{}".format(PORT, count))
+    print("{} scripts + {} stylesheets, {:.0f}ms simulated round trip".format(count, count, delay * 1000))
+    results = {}
+    for name, limit in [("sequential", 1), ("parallel", MAX_INFLIGHT_PER_ORIGIN)]:
+        HTTP_CACHE.clear()
+        results[name] = load(url, Fetcher(max_per_origin=limit))
+
+    print("{:<20}{:>14}{:>14}".format("stage", "sequential", "parallel"))
+    for stage in results["sequential"]:
+        print("{:<20}{:>12.1f}ms{:>12.1f}ms".format(
+            stage, results["sequential"][stage] * 1000, results["parallel"][stage] * 1000))
+    total = {name: sum(timings.values()) for name, timings in results.items()}
+    print("{:<20}{:>12.1f}ms{:>12.1f}ms  ({:.1f}x)".format(
+        "total", total["sequential"] * 1000, total["parallel"] * 1000,
+        total["sequential"] / total["parallel"]))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20,
+         float(sys.argv[2]) if len(sys.argv) > 2 else 0.02)
@@ -0,0 +1,147 @@
+# Times every stage of the rendering pipeline on generated documents, headless with
+# fixed-advance fonts, and saves the results as json so two runs can be compared.
+# Run from src/: PYTHONPATH=.. python benchmarks/Suite.py run [-o results.json] [--repeat N] [--corpus NAME ...]
+#                PYTHONPATH=.. python benchmarks/Suite.py compare old.json new.json [--threshold 0.1]
+import argparse
+import datetime
+import gc
+import json
+import platform
+import statistics
+import sys
+import time
+
+from src.benchmarks.Documents import deep_document, forms_document, prose_document, stylesheet, \
+    wide_document
+from src.dom.HTMLParser import HTMLParser
+from src.layout.DocumentLayout import DocumentLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.Fonts import set_font_provider
+from src.styling.RuleIndex import RuleIndex
+from src.styling.TableFont import TableFontProvider
+from src.user_agent.Utils import paint_tree
+
+# name -> (html, extra stylesheets), generated the same way every time
+CORPORA = {
+    "prose": lambda: (prose_document(200 * 1024), []),
+    "deep": lambda: (deep_document(300, tags=["div", "span", "b", "p"]), []),
+    "wide": lambda: (wide_document(5000), []),
+    "stylesheets": lambda: (prose_document(50 * 1024, seed=1),
+                            [stylesheet(40, seed) for seed in range(50)]),
+    "forms": lambda: (forms_document(500), []),
+}
+STAGES = ["parse html", "parse css", "style", "layout", "paint"]
+MIN_DIFFERENCE = 0.0005  # seconds, smaller changes are noise even if they are large relative ones
+
+
+def run_once(html: str, sheets: list[str], default_rules: list) -> tuple[dict[str, float], dict[str, int]]:
+    timings = {}
+
+    start = time.perf_counter()
+    root = HTMLParser(html).parse()
+    timings["parse html"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    rules = default_rules.copy()
+    for sheet in sheets:
+        rules.extend(CSSParser(sheet).parse())
+    timings["parse css"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    nodes = style(root, RuleIndex(sorted(rules, key=cascade_priority)), force=True)
+    timings["style"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    document = DocumentLayout(root)
+    document.layout()
+    timings["layout"] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    display_list = []
+    paint_tree(document, display_list)
+    timings["paint"] = time.perf_counter() - start
+
+    return timings, {"nodes": nodes, "rules": len(rules), "commands": len(display_list)}
+
+
+def run(corpora: list[str], repeat: int) -> dict:
+    set_font_provider(TableFontProvider.fixed())
+    default_rules = CSSParser(open("user_agent/browser.css").read()).parse()
+
+    results = {}
+    for name in corpora:
+        html, sheets = CORPORA[name]()
+        runs = []
+        for _ in range(repeat):
+            gc.collect()
+            timings, sizes = run_once(html, sheets, default_rules)
+            runs.append(timings)
+        results[name] = {
+            "sizes": dict(sizes, html_bytes=len(html)),
+            "stages": {stage: {"min": min(run[stage] for run in runs),
+                               "median": statistics.median(run[stage] for run in runs)}
+                       for stage in STAGES},
+        }
+        print("{:<12}".format(name), "  ".join(
+            "{} {:.1f}ms".format(stage, results[name]["stages"][stage]["min"] * 1000) for stage in STAGES))
+    return {
+        "meta": {"python": platform.python_version(), "platform": platform.platform(),
+                 "date": datetime.datetime.now().isoformat(timespec="seconds"), "repeat": repeat},
+        "results": results,
+    }
+
+
+# prints old and new minimum times per stage, returns whether any stage got slower than threshold
+def compare(old: dict, new: dict, threshold: float) -> bool:
+    slower = False
+    print("{:<12}{:<12}{:>10}{:>10}{:>9}".format("corpus", "stage", "old", "new", "change"))
+    for name, result in new["results"].items():
+        if name not in old["results"]:
+            continue
+        for stage, times in result["stages"].items():
+            before = old["results"][name]["stages"][stage]["min"]
+            after = times["min"]
+            change = after / before - 1 if before else 0
+            mark = ""
+            if abs(after - before) < MIN_DIFFERENCE:
+                pass
+            elif change > threshold:
+                mark = "  slower"
+                slower = True
+            elif change < -threshold:
+                mark = "  faster"
+            print("{:<12}{:<12}{:>8.1f}ms{:>8.1f}ms{:>+8.0%}{}".format(
+                name, stage, before * 1000, after * 1000, change, mark))
+    return slower
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Rendering pipeline benchmarks")
+    commands = parser.add_subparsers(dest="command", required=True)
+    run_parser = commands.add_parser("run")
+    run_parser.add_argument("-o", "--output", help="json file for the results")
+    run_parser.add_argument("--repeat", type=int, default=5)
+    run_parser.add_argument("--corpus", nargs="+", choices=list(CORPORA), default=list(CORPORA))
+    compare_parser = commands.add_parser("compare")
+    compare_parser.add_argument("old")
+    compare_parser.add_argument("new")
+    compare_parser.add_argument("--threshold", type=float, default=0.1,
+                                help="relative change that counts as slower or faster")
+    args = parser.parse_args(argv)
+
+    if args.command == "run":
+        results = run(args.corpus, args.repeat)
+        if args.output:
+            with open(args.output, "w") as f:
+                json.dump(results, f, indent=2)
+    else:
+        with open(args.old) as f:
+            old = json.load(f)
+        with open(args.new) as f:
+            new = json.load(f)
+        if compare(old, new, args.threshold):
+            sys.exit(1)  # so scripts can fail on regressions
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
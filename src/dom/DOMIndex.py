@@ -0,0 +1,83 @@
+import bisect
+
+from src.dom.Element import Element
+from src.dom.Traversal import elements
+
+NO_ELEMENTS = ()
+
+
+class DOMIndex:
+    # the elements of a document by tag, each list in document order. Selectors only know tags,
+    # ids and classes would get their own maps next to by_tag
+    def __init__(self, root: Element) -> None:
+        self.root = root
+        self.orders: dict[Element, float] = {}  # document order, increasing but with gaps for inserts
+        self.by_tag: dict[str, list[Element]] = {}
+        self.keys: dict[str, list[float]] = {}  # the orders of the elements in by_tag
+        self.rebuild()
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def rebuild(self) -> None:
+        self.orders.clear()
+        self.by_tag.clear()
+        self.keys.clear()
+        for order, node in enumerate(elements(self.root)):
+            self.orders[node] = float(order)
+            self.by_tag.setdefault(node.tag, []).append(node)
+            self.keys.setdefault(node.tag, []).append(float(order))
+
+    # the elements with the tag in document order, must not be changed
+    def get(self, tag: str) -> list[Element]:
+        return self.by_tag.get(tag, NO_ELEMENTS)
+
+    # the children of elt were replaced by new ones, only their subtrees are indexed again
+    def replace_children(self, elt: Element, old_children: list) -> None:
+        if elt not in self.orders:
+            return  # not in the document
+        old = [node for child in old_children for node in elements(child)]
+        new = [node for child in elt.children for node in elements(child)]
+        if len(old) + len(new) > len(self.orders) // 4 + 64:
+            self.rebuild()
+            return
+
+        for node in old:
+            tag_keys = self.keys[node.tag]
+            i = bisect.bisect_left(tag_keys, self.orders.pop(node))
+            del tag_keys[i]
+            del self.by_tag[node.tag][i]
+
+        orders = self.new_orders(elt, len(new))
+        if orders is None:
+            self.rebuild()
+            return
+        for node, order in zip(new, orders):
+            self.orders[node] = order
+            tag_keys = self.keys.setdefault(node.tag, [])
+            i = bisect.bisect_left(tag_keys, order)
+            tag_keys.insert(i, order)
+            self.by_tag.setdefault(node.tag, []).insert(i, node)
+
+    # orders for count elements between elt and the next element after its subtree,
+    # None if there is no room left
+    def new_orders(self, elt: Element, count: int) -> list[float] | None:
+        low = self.orders[elt]
+        high = self.following(elt)
+        if high is None:
+            high = low + count + 1
+        step = (high - low) / (count + 1)
+        if step < 1e-6:
+            return None
+        return [low + step * (i + 1) for i in range(count)]
+
+    # the order of the first element after the subtree of node, None at the end of the document.
+    # Element siblings are indexed, the first one with a higher order is the next one
+    def following(self, node: Element) -> float | None:
+        while node is not self.root and node.parent is not None:
+            order = self.orders[node]
+            for sibling in node.parent.children:
+                if isinstance(sibling, Element) and self.orders[sibling] > order:
+                    return self.orders[sibling]
+            node = node.parent
+        return None
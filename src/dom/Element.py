@@ -1,14 +1,45 @@
 from __future__ import annotations
 
+from types import MappingProxyType
+
+EMPTY_STYLE = MappingProxyType({})  # shared until the node is styled, style() assigns a new mapping
+
 
 class Element:
+    __slots__ = ("tag", "attributes", "children", "parent", "style", "is_focused",
+                 "style_dirty", "children_style_dirty", "layout_dirty")
+
     def __init__(self, tag: str, attributes: dict[str, str], parent: Element | None) -> None:
         self.tag = tag
         self.attributes = attributes
         self.children = []
         self.parent = parent
-        self.style = {}
+        self.style = EMPTY_STYLE
         self.is_focused = False
+        # new nodes have never been styled
+        self.style_dirty = True
+        self.children_style_dirty = True
+        self.layout_dirty = True  # this node or one of its descendants changed since the last layout
+
+    # the element's own style has to be computed again, e.g. after its style attribute changed
+    def mark_style_dirty(self) -> None:
+        self.style_dirty = True
+        if self.parent:
+            self.parent.mark_children_dirty()
+
+    # some descendant has to be restyled, so style() can't skip this subtree
+    def mark_children_dirty(self) -> None:
+        node = self
+        while node and not node.children_style_dirty:
+            node.children_style_dirty = True
+            node = node.parent
+
+    # dirty nodes always have dirty ancestors, so layout can reuse everything that is clean
+    def mark_layout_dirty(self) -> None:
+        node = self
+        while node and not node.layout_dirty:
+            node.layout_dirty = True
+            node = node.parent
 
     def __repr__(self):
         return "<" + self.tag + ">"
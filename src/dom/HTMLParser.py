@@ -1,5 +1,9 @@
+import re
+import sys
+
 from src.dom.Element import Element
 from src.dom.Text import Text
+from src.dom.Traversal import with_depth
 
 
 class HTMLParser:
@@ -12,26 +16,45 @@ class HTMLParser:
         "link", "meta", "title", "style", "script",
     ]
 
-    def __init__(self, body: str):
+    TOKENS = re.compile("([^<>]*)([<>])")
+
+    def __init__(self, body: str = "") -> None:
         self.body = body
         self.unfinished = []
+        self.pending = []  # text after the last < or >, can span several chunks
+        self.in_tag = False
 
     def parse(self) -> Element:
-        token = ""
-        in_tag = False
-        for c in self.body:
-            if c == "<":
-                in_tag = True
+        self.feed(self.body)
+        return self.close()
+
+    # chunks can be split anywhere, even inside a tag
+    def feed(self, chunk: str) -> None:
+        tokens = self.TOKENS.findall(chunk)  # (text before the delimiter, delimiter)
+        if not tokens:
+            self.pending.append(chunk)
+            return
+        if self.pending:
+            self.pending.append(tokens[0][0])
+            tokens[0] = ("".join(self.pending), tokens[0][1])
+            self.pending = []
+
+        for token, delimiter in tokens:
+            if delimiter == "<":
                 if token:
                     self.add_text(token)  # empty text not possible
-                token = ""
-            elif c == ">":
-                in_tag = False
-                self.add_tag(token)  # empty tag is possible
-                token = ""
             else:
-                token += c
-        if not in_tag and token:
+                self.add_tag(token)  # empty tag is possible
+        self.in_tag = tokens[-1][1] == "<"
+
+        rest = chunk[max(chunk.rfind("<"), chunk.rfind(">")) + 1:]
+        if rest:
+            self.pending.append(rest)
+
+    def close(self) -> Element:
+        token = "".join(self.pending)
+        self.pending = []
+        if not self.in_tag and token:
             self.add_text(token)  # dump any remaining text
         return self.finish()  # we handle missing closing tags, but not unfinished tags!
 
@@ -75,7 +98,9 @@ class HTMLParser:
         return self.unfinished.pop()  # return root html element
 
     def implicit_tags(self, tag: str | None) -> None:
-        while True:
+        # only html, head and body are ever added implicitly, which happens in the first two levels,
+        # so deeper in the document this is a constant time check and open_tags stays tiny
+        while len(self.unfinished) <= 2:
             open_tags = [node.tag for node in self.unfinished]
             if open_tags == [] and tag != "html":
                 self.add_tag("html")
@@ -86,27 +111,27 @@ class HTMLParser:
                 else:
                     self.add_tag("body")
             elif (open_tags == ["html", "head"] and
-                  tag not in ["/head"] + self.HEAD_TAGS):
+                  tag != "/head" and tag not in self.HEAD_TAGS):
                 self.add_tag("/head")
             else:
                 break
 
     def get_attributes(self, text: str) -> tuple[str, dict[str, str]]:
         parts = text.split()
-        tag = parts[0].casefold()
+        # tag names and attribute keys repeat a lot, interning lets all nodes share one string
+        tag = sys.intern(parts[0].casefold())
         attributes = {}
         for attrpair in parts[1:]:
             if "=" in attrpair:  # when key value pair, e.g. <input type="text">
                 key, value = attrpair.split("=", 1)
                 if len(value) > 2 and value[0] in ["'", "\""]:  # when value is quoted
                     value = value[1:-1]
-                attributes[key.casefold()] = value
+                attributes[sys.intern(key.casefold())] = value
             else:
-                attributes[attrpair.casefold()] = ""  # when no value is given, e.g. <input disabled>
+                attributes[sys.intern(attrpair.casefold())] = ""  # when no value is given, e.g. <input disabled>
         return tag, attributes
 
 
 def print_tree(node, indent=0):
-    print(" " * indent, node)
-    for child in node.children:
-        print_tree(child, indent + 2)
+    for depth, child in with_depth(node):
+        print(" " * (indent + 2 * depth), child)
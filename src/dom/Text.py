@@ -1,13 +1,25 @@
-from src.dom.Element import Element
+from src.dom.Element import EMPTY_STYLE, Element
+
+EMPTY_CHILDREN = ()  # text nodes never have children, so they all share this one
 
 
 class Text:
+    __slots__ = ("text", "parent", "style", "is_focused", "style_dirty", "layout_dirty")
+    children = EMPTY_CHILDREN
+    children_style_dirty = False
+
     def __init__(self, text: str, parent: Element) -> None:
         self.text = text
-        self.children = []
         self.parent = parent
-        self.style = {}
-        self.is_focused = False
+        self.style = EMPTY_STYLE
+        self.is_focused = False  # focus handling can set it on any node
+        self.style_dirty = True
+        self.layout_dirty = True
+
+    def mark_layout_dirty(self) -> None:
+        self.layout_dirty = True
+        if self.parent:
+            self.parent.mark_layout_dirty()
 
     def __repr__(self):
         return repr(self.text)
@@ -0,0 +1,50 @@
+from typing import Callable, Iterator
+
+from src.dom.Element import Element
+
+# Iterative walks over anything with a children list, DOM and layout trees alike.
+# They keep their own stack, so deeply nested documents can't hit the recursion limit,
+# and they yield nodes one by one for callers that only filter or look for one node
+
+
+# every node before its children, in document order.
+# descend can stop the walk from going into the children of a node
+def pre_order(tree, descend: Callable[..., bool] | None = None) -> Iterator:
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        yield node
+        if node.children and (descend is None or descend(node)):
+            stack.extend(reversed(node.children))
+
+
+# every node after its children
+def post_order(tree) -> Iterator:
+    stack = [(tree, False)]
+    while stack:
+        node, children_done = stack.pop()
+        if children_done or not node.children:
+            yield node
+        else:
+            stack.append((node, True))
+            stack.extend((child, False) for child in reversed(node.children))
+
+
+# (depth, node) in pre-order, the tree itself has depth 0
+def with_depth(tree) -> Iterator[tuple[int, object]]:
+    stack = [(0, tree)]
+    while stack:
+        depth, node = stack.pop()
+        yield depth, node
+        stack.extend((depth + 1, child) for child in reversed(node.children))
+
+
+def of_type(tree, kind: type) -> Iterator:
+    return (node for node in pre_order(tree) if isinstance(node, kind))
+
+
+# the elements with one of the tags, or all elements if no tags are given
+def elements(tree, *tags: str) -> Iterator[Element]:
+    if not tags:
+        return of_type(tree, Element)
+    return (node for node in pre_order(tree) if isinstance(node, Element) and node.tag in tags)
@@ -0,0 +1,101 @@
+import bisect
+
+
+class DisplayListIndex:
+    # finds the commands in a range of y coordinates without looking at every command
+    def __init__(self, tall: float) -> None:
+        self.tall = tall  # commands higher than this are kept out of the sorted index
+        self.commands = []  # the display list in paint order
+        self.orders = []  # paint order of self.commands, increasing but with gaps for inserts
+        self.keys = []  # (top, order) of every short command, sorted
+        self.short = []  # the short commands in the order of self.keys
+        self.tall_commands = []  # (order, command), sorted
+
+    def __len__(self) -> int:
+        return len(self.commands)
+
+    # takes the new display list from a render and only re-indexes the part that changed.
+    # Layout objects that did not change paint the same command objects again,
+    # so the unchanged start and end of the list are found by identity
+    def update(self, display_list: list) -> None:
+        old = self.commands
+        start = 0
+        limit = min(len(old), len(display_list))
+        while start < limit and old[start] is display_list[start]:
+            start += 1
+        end_old, end_new = len(old), len(display_list)
+        while end_old > start and end_new > start \
+                and old[end_old - 1] is display_list[end_new - 1]:
+            end_old -= 1
+            end_new -= 1
+        self.commands = display_list
+
+        changed = (end_old - start) + (end_new - start)
+        orders = self.new_orders(start, end_old, end_new - start)
+        if orders is None or changed > len(display_list) // 4 + 64:
+            self.rebuild()
+            return
+
+        for i in range(start, end_old):
+            self.remove(old[i], self.orders[i])
+        self.orders[start:end_old] = orders
+        for cmd, order in zip(display_list[start:end_new], orders):
+            self.insert(cmd, order)
+
+    # orders for count commands between the unchanged ones, None if there is no room left
+    def new_orders(self, start: int, end_old: int, count: int) -> list[float] | None:
+        if not count:
+            return []
+        if start > 0:
+            low = self.orders[start - 1]
+        elif end_old < len(self.orders):
+            low = self.orders[end_old] - count - 1
+        else:
+            low = 0.0
+        high = self.orders[end_old] if end_old < len(self.orders) else low + count + 1
+        step = (high - low) / (count + 1)
+        if step < 1e-6:
+            return None
+        return [low + step * (i + 1) for i in range(count)]
+
+    def rebuild(self) -> None:
+        self.orders = [float(i) for i in range(len(self.commands))]
+        self.tall_commands = []
+        entries = []
+        for order, cmd in zip(self.orders, self.commands):
+            if cmd.rect.bottom - cmd.rect.top > self.tall:
+                self.tall_commands.append((order, cmd))
+            else:
+                entries.append(((cmd.rect.top, order), cmd))
+        entries.sort(key=lambda entry: entry[0])
+        self.keys = [key for key, cmd in entries]
+        self.short = [cmd for key, cmd in entries]
+
+    def insert(self, cmd, order: float) -> None:
+        if cmd.rect.bottom - cmd.rect.top > self.tall:
+            bisect.insort(self.tall_commands, (order, cmd), key=lambda entry: entry[0])
+        else:
+            i = bisect.bisect_left(self.keys, (cmd.rect.top, order))
+            self.keys.insert(i, (cmd.rect.top, order))
+            self.short.insert(i, cmd)
+
+    def remove(self, cmd, order: float) -> None:
+        if cmd.rect.bottom - cmd.rect.top > self.tall:
+            i = bisect.bisect_left(self.tall_commands, order, key=lambda entry: entry[0])
+            del self.tall_commands[i]
+        else:
+            i = bisect.bisect_left(self.keys, (cmd.rect.top, order))
+            del self.keys[i]
+            del self.short[i]
+
+    # the commands that reach into top..bottom, in paint order
+    def visible(self, top: float, bottom: float) -> list:
+        # a short command that ends below top has to start below top - self.tall
+        lo = bisect.bisect_left(self.keys, (top - self.tall,))
+        hi = bisect.bisect_right(self.keys, (bottom, float("inf")))
+        hits = [(self.keys[i][1], self.short[i]) for i in range(lo, hi)
+                if self.short[i].rect.bottom >= top]
+        hits.extend((order, cmd) for order, cmd in self.tall_commands
+                    if cmd.rect.top <= bottom and cmd.rect.bottom >= top)
+        hits.sort(key=lambda hit: hit[0])
+        return [cmd for order, cmd in hits]
@@ -7,8 +7,15 @@ class DrawLine:
         self.color = color
         self.thickness = thickness
 
-    def execute(self, scroll, canvas):
-        canvas.create_line(
+    def execute(self, scroll, canvas, tags=()) -> int:
+        return canvas.create_line(
             self.rect.left, self.rect.top - scroll,
             self.rect.right, self.rect.bottom - scroll,
-            fill=self.color, width=self.thickness)
+            fill=self.color, width=self.thickness, tags=tags)
+
+    # changes an item made by execute into this command
+    def update(self, scroll, canvas, item) -> None:
+        canvas.coords(item,
+                      self.rect.left, self.rect.top - scroll,
+                      self.rect.right, self.rect.bottom - scroll)
+        canvas.itemconfigure(item, fill=self.color, width=self.thickness)
@@ -4,9 +4,16 @@ class DrawOutline:
         self.color = color
         self.thickness = thickness
 
-    def execute(self, scroll, canvas):
-        canvas.create_rectangle(
+    def execute(self, scroll, canvas, tags=()) -> int:
+        return canvas.create_rectangle(
             self.rect.left, self.rect.top - scroll,
             self.rect.right, self.rect.bottom - scroll,
             width=self.thickness,
-            outline=self.color)
+            outline=self.color, tags=tags)
+
+    # changes an item made by execute into this command
+    def update(self, scroll, canvas, item) -> None:
+        canvas.coords(item,
+                      self.rect.left, self.rect.top - scroll,
+                      self.rect.right, self.rect.bottom - scroll)
+        canvas.itemconfigure(item, width=self.thickness, outline=self.color)
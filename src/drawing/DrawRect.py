@@ -6,9 +6,16 @@ class DrawRect:
         self.rect = rect
         self.color = color
 
-    def execute(self, scroll, canvas):
-        canvas.create_rectangle(
+    def execute(self, scroll, canvas, tags=()) -> int:
+        return canvas.create_rectangle(
             self.rect.left, self.rect.top - scroll,
             self.rect.right, self.rect.bottom - scroll,
             width=0,
-            fill=self.color)
+            fill=self.color, tags=tags)
+
+    # changes an item made by execute into this command
+    def update(self, scroll, canvas, item) -> None:
+        canvas.coords(item,
+                      self.rect.left, self.rect.top - scroll,
+                      self.rect.right, self.rect.bottom - scroll)
+        canvas.itemconfigure(item, fill=self.color)
@@ -1,7 +1,10 @@
-from tkinter import Canvas
+from typing import TYPE_CHECKING
 
 from src.layout.Rect import Rect
 
+if TYPE_CHECKING:
+    from tkinter import Canvas
+
 
 class DrawText:
     def __init__(self, x1, y1, text, font, color):
@@ -14,10 +17,15 @@ class DrawText:
         self.rect = Rect(x1, y1,
                          x1 + font.measure(text), self.bottom)
 
-    def execute(self, scroll, canvas: Canvas):
-        canvas.create_text(
+    def execute(self, scroll, canvas: "Canvas", tags=()) -> int:
+        return canvas.create_text(
             self.left, self.top - scroll,
             text=self.text,
             font=self.font,
             fill=self.color,
-            anchor='nw')
+            anchor='nw', tags=tags)
+
+    # changes an item made by execute into this command
+    def update(self, scroll, canvas: "Canvas", item) -> None:
+        canvas.coords(item, self.left, self.top - scroll)
+        canvas.itemconfigure(item, text=self.text, font=self.font, fill=self.color)
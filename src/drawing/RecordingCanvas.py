@@ -0,0 +1,83 @@
+# stands in for a tkinter Canvas and records what the draw commands would draw
+class RecordingCanvas:
+    def __init__(self) -> None:
+        self.by_id: dict[int, dict] = {}
+        self.tags: dict[int, set[str]] = {}
+        self.order: list[int] = []  # stacking order, the last one is on top
+        self.next_id = 1  # item ids start at 1 like in tkinter
+        self.calls = 0  # every call would be a round trip to Tk on a real canvas
+
+    # the items from bottom to top
+    @property
+    def items(self) -> list[dict]:
+        return [self.by_id[item] for item in self.order]
+
+    def create_text(self, x, y, font, tags=(), **options) -> int:
+        return self.record("text", tags, x, y, font=list(font.key), **options)
+
+    def create_line(self, *coords, tags=(), **options) -> int:
+        return self.record("line", tags, *coords, **options)
+
+    def create_rectangle(self, *coords, tags=(), **options) -> int:
+        return self.record("rectangle", tags, *coords, **options)
+
+    def record(self, type: str, tags, *coords, **options) -> int:
+        self.calls += 1
+        item = self.next_id
+        self.next_id += 1
+        self.by_id[item] = dict(type=type, coords=list(coords), **options)
+        self.tags[item] = {tags} if isinstance(tags, str) else set(tags)
+        self.order.append(item)
+        return item
+
+    def find(self, tag_or_id) -> list[int]:
+        if isinstance(tag_or_id, int):
+            return [tag_or_id] if tag_or_id in self.by_id else []
+        return [item for item in self.order
+                if tag_or_id == "all" or tag_or_id in self.tags[item]]
+
+    def delete(self, *tags_or_ids) -> None:
+        self.calls += 1
+        for tag_or_id in tags_or_ids:
+            for item in self.find(tag_or_id):
+                del self.by_id[item]
+                del self.tags[item]
+                self.order.remove(item)
+
+    def move(self, tag_or_id, dx, dy) -> None:
+        self.calls += 1
+        for item in self.find(tag_or_id):
+            coords = self.by_id[item]["coords"]
+            for i in range(len(coords)):
+                coords[i] += dx if i % 2 == 0 else dy
+
+    def coords(self, item: int, *coords) -> None:
+        self.calls += 1
+        self.by_id[item]["coords"] = list(coords)
+
+    def itemconfigure(self, item: int, **options) -> None:
+        self.calls += 1
+        if "font" in options:
+            options["font"] = list(options["font"].key)
+        self.by_id[item].update(options)
+
+    def tag_raise(self, tag_or_id, above=None) -> None:
+        self.restack(tag_or_id, above, 1)
+
+    def tag_lower(self, tag_or_id, below=None) -> None:
+        self.restack(tag_or_id, below, 0)
+
+    # moves the items right above (side 1) or below (side 0) another item, or to the top or bottom
+    def restack(self, tag_or_id, other, side: int) -> None:
+        self.calls += 1
+        items = self.find(tag_or_id)
+        if not items:
+            return
+        for item in items:
+            self.order.remove(item)
+        if other is None:
+            position = len(self.order) if side else 0
+        else:
+            others = [self.order.index(item) for item in self.find(other)]
+            position = max(others) + 1 if side else min(others)
+        self.order[position:position] = items
@@ -1,8 +1,10 @@
 import dukpy
 
+from src.dom.DOMIndex import DOMIndex
 from src.dom.HTMLParser import HTMLParser
-from src.styling.CSSParser import CSSParser
-from src.user_agent.Utils import tree_to_list
+from src.dom.Traversal import pre_order
+from src.styling.CSSParser import parse_selector
+from src.user_agent.Profiler import PROFILER
 
 RUNTIME_JS = open("js/runtime.js").read()
 EVENT_DISPATCH_JS = \
@@ -13,8 +15,11 @@ class JSContext:
     def __init__(self, tab):
         self.tab = tab
 
+        # only nodes in the document keep their handles, handles of detached nodes are released
         self.node_to_handle = {}
         self.handle_to_node = {}
+        self.next_handle = 0  # never reused, so a released handle can't point to another node
+        self.dom_index = None  # built on the first query, for the current document
         self.interp = dukpy.JSInterpreter()
 
         self.interp.export_function("log", print)
@@ -25,7 +30,8 @@ class JSContext:
 
         self.interp.export_function("XMLHttpRequest_send", self.XMLHttpRequest_send)
 
-        self.interp.evaljs(RUNTIME_JS)
+        # the runtime only defines things, its value would be a function that dukpy can't return
+        self.interp.evaljs(RUNTIME_JS + "\nnull")
 
     def run(self, script, code):
         try:
@@ -34,14 +40,22 @@ class JSContext:
             print("Script", script, "crashed", e)
 
     def querySelectorAll(self, selector_text):
-        selector = CSSParser(selector_text).selector()
+        selector = parse_selector(selector_text)
+        # every selector ends in a tag selector, so only elements with that tag can match
         nodes = [node for node
-                 in tree_to_list(self.tab.nodes, [])
+                 in self.index().get(selector.rightmost_tag)
                  if selector.matches(node)]
         return [self.get_handle(node) for node in nodes]
 
+    def index(self) -> DOMIndex:
+        if self.dom_index is None or self.dom_index.root is not self.tab.nodes:
+            self.dom_index = DOMIndex(self.tab.nodes)
+        return self.dom_index
+
     def getAttribute(self, handle, attr):
-        elt = self.handle_to_node[handle]
+        elt = self.handle_to_node.get(handle)
+        if elt is None:  # released, the node is not in the document anymore
+            return ""
         attr = elt.attributes.get(attr, None)
         return attr if attr else ""
 
@@ -53,25 +67,55 @@ class JSContext:
             EVENT_DISPATCH_JS, type=type, handle=handle)
         return not do_default
 
+    # returns the released handles, so the runtime can drop their listeners
     def innerHTML_set(self, handle, s):
+        elt = self.handle_to_node.get(handle)
+        if elt is None:  # released, the node is not in the document anymore
+            return []
         # hack um html fragmente zu parsen
         doc = HTMLParser("<html><body>" + s + "</body></html>").parse()
         new_nodes = doc.children[0].children  # root.body.children
-        elt = self.handle_to_node[handle]
+        old_nodes = elt.children
         elt.children = new_nodes
         for child in elt.children:
             child.parent = elt
+        if self.dom_index is not None and self.dom_index.root is self.tab.nodes:
+            self.dom_index.replace_children(elt, old_nodes)
+        elt.mark_children_dirty()  # the new nodes need styles
+        elt.mark_layout_dirty()
+        released = self.release_handles(old_nodes)
         self.tab.render()
+        return released
 
     def get_handle(self, elt):
         if elt not in self.node_to_handle:
-            handle = len(self.node_to_handle)
+            handle = self.next_handle
+            self.next_handle += 1
             self.node_to_handle[elt] = handle
             self.handle_to_node[handle] = elt
+            if PROFILER.enabled:
+                PROFILER.gauge("live js handles", self.live_handles())
         else:
             handle = self.node_to_handle[elt]
         return handle
 
+    # the nodes are detached from the document, so scripts can't find them again
+    def release_handles(self, nodes: list) -> list[int]:
+        released = []
+        if self.node_to_handle:
+            for child in nodes:
+                for node in pre_order(child):
+                    handle = self.node_to_handle.pop(node, None)
+                    if handle is not None:
+                        del self.handle_to_node[handle]
+                        released.append(handle)
+        if PROFILER.enabled:
+            PROFILER.gauge("live js handles", self.live_handles())
+        return released
+
+    def live_handles(self) -> int:
+        return len(self.handle_to_node)
+
     def XMLHttpRequest_send(self, method, url, body):
         full_url = self.tab.url.resolve(url)
 
@@ -43,10 +43,18 @@ Node.prototype.dispatchEvent = function (evt) {
 
 Object.defineProperty(Node.prototype, 'innerHTML', {
     set: function (s) {
-        call_python("innerHTML_set", this.handle, s.toString());
+        var released = call_python("innerHTML_set", this.handle, s.toString());
+        releaseHandles(released);
     }
 })
 
+// the nodes of these handles were removed from the document, their listeners can never run again
+function releaseHandles(handles) {
+    for (var i = 0; i < handles.length; i++) {
+        delete LISTENERS[handles[i]];
+    }
+}
+
 function Event(type) {
     this.type = type
     this.do_default = true;
@@ -4,13 +4,14 @@ from typing import Literal
 
 from src.dom.Element import Element
 from src.dom.Text import Text
+from src.dom.Traversal import pre_order
 from src.drawing.DrawRect import DrawRect
 from src.layout.InputLayout import InputLayout
 from src.layout.LineLayout import LineLayout
 from src.layout.Rect import Rect
 from src.layout.TextLayout import TextLayout
-from src.styling.Fonts import get_font
 from src.user_agent.Constants import INPUT_WIDTH_PX
+from src.user_agent.Profiler import PROFILER
 
 BLOCK_ELEMENTS = [
     "html", "body", "article", "section", "nav", "aside",
@@ -22,8 +23,15 @@ BLOCK_ELEMENTS = [
 ]
 
 
+# the text of inputs and buttons is painted by their InputLayout
+def has_inline_children(node: Element) -> bool:
+    return node.tag != "br" and node.tag != "input" and node.tag != "button"
+
+
 class BlockLayout:
     def __init__(self, node: Element, parent, previous: BlockLayout | None) -> None:
+        if PROFILER.enabled:
+            PROFILER.count("layout objects")
         self.node = node
         self.parent = parent
         self.previous = previous  # sibling
@@ -34,37 +42,81 @@ class BlockLayout:
         self.y = None
         self.cursor_x = None
         self.height = None
+        self.painted = None  # (what was painted, commands), an unchanged block reuses its commands
 
     # width: top-down calculation
     # height: bottom-up calculation
+    # blocks are laid out with an explicit stack instead of recursion, so deeply nested
+    # documents can't hit the recursion limit. A block is finished after all its children
     def layout(self):
+        stack = [(self, False)]
+        while stack:
+            block, children_done = stack.pop()
+            if children_done:
+                block.finish()
+            elif block.start():
+                stack.append((block, True))
+                # the children are either all blocks or all lines, lines are laid out right away
+                stack.extend((child, False) for child in reversed(block.children)
+                             if isinstance(child, BlockLayout))
+
+    # positions the block and creates its children, False if it could be reused as it is
+    def start(self) -> bool:
         if self.previous:  # if there is a previous block, position this one below it
-            self.y = self.previous.y + self.previous.height
+            y = self.previous.y + self.previous.height
         else:  # first child element starts at same y position as the parent
-            self.y = self.parent.y
-        self.x = self.parent.x  # horizontal position always the same as the parent
-        self.width = self.parent.width
+            y = self.parent.y
+        x = self.parent.x  # horizontal position always the same as the parent
+        width = self.parent.width
+
+        # nothing in this subtree changed since the last layout, at most it moved down or up
+        if not self.node.layout_dirty and self.height is not None \
+                and x == self.x and width == self.width:
+            if y != self.y:
+                self.shift(y - self.y)
+            return False
+        self.x, self.y, self.width = x, y, width
 
         mode = self.layout_mode()  # TODO: welchen layout Modus für die Kinder!!
         if mode == "block":
+            # keep the layout objects of child nodes from the last layout
+            old_children = {child.node: child for child in self.children
+                            if isinstance(child, BlockLayout)}
+            self.children = []
             previous = None
             for child in self.node.children:
-                next = BlockLayout(child, self, previous)
+                next = old_children.get(child) or BlockLayout(child, self, previous)
+                next.previous = previous
                 self.children.append(next)
                 previous = next
 
         else:  # mode == "inline"
+            self.children = []
             self.new_line()
             self.recurse(self.node)
+            self.clean(self.node)
+            for line in self.children:
+                line.layout()
+        return True
 
-        # layout all children recursively before finishing own layout
-        for child in self.children:
-            child.layout()
-
+    # all children are laid out
+    def finish(self) -> None:
         # height is now height of all children elements (including line layouts)
         # wenn BlockLayout nichts enthält (auch kein Text) ist Höhe von Linelayout 0
         # dann Höhe von BlockLayout hier auch 0
         self.height = sum([child.height for child in self.children])
+        self.node.layout_dirty = False
+
+    # moves this block and everything inside it, without laying it out again
+    def shift(self, dy: float) -> None:
+        for layout_object in pre_order(self):
+            layout_object.y += dy
+
+    # inline content was laid out completely, so none of its nodes are dirty anymore
+    @staticmethod
+    def clean(node: Element | Text) -> None:
+        for node in pre_order(node):
+            node.layout_dirty = False
 
     def layout_mode(self) -> Literal["inline", "block"]:
         if isinstance(self.node, Text):
@@ -81,18 +133,16 @@ class BlockLayout:
         else:  # fallback - any self-closing tag or empty element (e.g. <div></div>)
             return "block"
 
+    # lays out the words and inputs of the inline content below node in document order
     def recurse(self, node: Text | Element) -> None:
-        if isinstance(node, Text):
-            for word in node.text.split():
-                self.word(node, word)
-        else:  # node is an Element
-            if node.tag == "br":
+        for node in pre_order(node, descend=has_inline_children):
+            if isinstance(node, Text):
+                for word in node.text.split():
+                    self.word(node, word)
+            elif node.tag == "br":
                 self.new_line()
             elif node.tag == "input" or node.tag == "button":
                 self.input(node)
-            else:
-                for child in node.children:
-                    self.recurse(child)
 
     def new_line(self):
         self.cursor_x = 0
@@ -101,17 +151,12 @@ class BlockLayout:
         self.children.append(new_line)
 
     def word(self, node: Text, word: str) -> None:
-        weight = node.style["font-weight"]
-        style = node.style["font-style"]
-        if style == "normal":
-            style = "roman"
-        size = int(float(node.style["font-size"][:-2]) * .75)  # convert css px to tkinter font size
-        font = get_font(size, weight, style)
+        font = node.style.font()
         w = font.measure(word)
 
         if self.cursor_x + w > self.width:
             self.new_line()
-        self.cursor_x += w + font.measure(" ")
+        self.cursor_x += w + font.space_width
 
         line = self.children[-1]  # LineLayouts are direct children of BlockLayout
         previous_word = line.children[-1] if line.children else None
@@ -127,27 +172,27 @@ class BlockLayout:
         input = InputLayout(node, line, previous_word)
         line.children.append(input)
 
-        weight = node.style["font-weight"]
-        style = node.style["font-style"]
-        if style == "normal":
-            style = "roman"
-        size = int(float(node.style["font-size"][:-2]) * .75)
-        font = get_font(size, weight, style)
+        font = node.style.font()
 
-        self.cursor_x += w + font.measure(" ")
+        self.cursor_x += w + font.space_width
 
     def should_paint(self):
         return isinstance(self.node, Text) or \
             (self.node.tag != "input" and self.node.tag != "button")
 
     def paint(self) -> list[DrawRect]:
-        cmds = []
         bgcolor = self.node.style.get("background-color",
                                       "transparent")
+        key = (self.x, self.y, self.width, self.height, bgcolor)
+        if self.painted is not None and self.painted[0] == key:
+            return self.painted[1]
+
+        cmds = []
         if bgcolor != "transparent":
             rect = DrawRect(self.self_rect(), bgcolor)
             cmds.append(rect)
 
+        self.painted = (key, cmds)
         return cmds
 
     def self_rect(self) -> Rect:
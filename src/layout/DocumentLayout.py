@@ -1,10 +1,13 @@
 from src.dom.Element import Element
 from src.layout.BlockLayout import BlockLayout
 from src.user_agent.Constants import *
+from src.user_agent.Profiler import PROFILER
 
 
 class DocumentLayout:
     def __init__(self, node: Element):
+        if PROFILER.enabled:
+            PROFILER.count("layout objects")
         self.node = node
         self.parent = None
         self.children = []
@@ -19,8 +22,9 @@ class DocumentLayout:
         self.x = HSTEP
         self.y = VSTEP
 
-        child = BlockLayout(self.node, self, None)
-        self.children.append(child)
+        if not self.children:  # later layouts reuse the block tree
+            self.children.append(BlockLayout(self.node, self, None))
+        child = self.children[0]
         child.layout()
 
         self.height = child.height
@@ -3,12 +3,14 @@ from src.drawing.DrawLine import DrawLine
 from src.drawing.DrawRect import DrawRect
 from src.drawing.DrawText import DrawText
 from src.layout.Rect import Rect
-from src.styling.Fonts import get_font
 from src.user_agent.Constants import INPUT_WIDTH_PX
+from src.user_agent.Profiler import PROFILER
 
 
 class InputLayout:
     def __init__(self, node, parent, previous):
+        if PROFILER.enabled:
+            PROFILER.count("layout objects")
         self.y = None
         self.x = None
         self.height = None
@@ -20,17 +22,12 @@ class InputLayout:
         self.previous = previous
 
     def layout(self):
-        weight = self.node.style["font-weight"]
-        style = self.node.style["font-style"]
-        if style == "normal":
-            style = "roman"
-        size = int(float(self.node.style["font-size"][:-2]) * .75)
-        self.font = get_font(size, weight, style)
+        self.font = self.node.style.font()
 
         self.width = INPUT_WIDTH_PX
 
         if self.previous:
-            space = self.previous.font.measure(" ")
+            space = self.previous.font.space_width
             self.x = self.previous.x + space + self.previous.width
         else:
             self.x = self.parent.x
@@ -1,5 +1,10 @@
+from src.user_agent.Profiler import PROFILER
+
+
 class LineLayout:
     def __init__(self, node, parent, previous):
+        if PROFILER.enabled:
+            PROFILER.count("layout objects")
         self.node = node
         self.parent = parent
         self.previous = previous
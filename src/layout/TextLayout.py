@@ -1,9 +1,11 @@
 from src.drawing.DrawText import DrawText
-from src.styling.Fonts import get_font
+from src.user_agent.Profiler import PROFILER
 
 
 class TextLayout:
     def __init__(self, node, word, parent, previous):
+        if PROFILER.enabled:
+            PROFILER.count("layout objects")
         self.node = node
         self.word = word
         self.children = []
@@ -11,23 +13,19 @@ class TextLayout:
         self.previous = previous
 
         self.font = None
+        self.painted = None  # (what was painted, commands), an unchanged word reuses its commands
         self.height = None
         self.x = None
         self.y = None
         self.width = None
 
     def layout(self):
-        weight = self.node.style["font-weight"]
-        style = self.node.style["font-style"]
-        if style == "normal":
-            style = "roman"
-        size = int(float(self.node.style["font-size"][:-2]) * .75)
-        self.font = get_font(size, weight, style)
+        self.font = self.node.style.font()
 
         self.width = self.font.measure(self.word)
 
         if self.previous:
-            space = self.previous.font.measure(" ")
+            space = self.previous.font.space_width
             self.x = self.previous.x + space + self.previous.width
         else:
             self.x = self.parent.x
@@ -39,4 +37,7 @@ class TextLayout:
 
     def paint(self):
         color = self.node.style["color"]
-        return [DrawText(self.x, self.y, self.word, self.font, color)]
+        key = (self.x, self.y, self.word, self.font, color)
+        if self.painted is None or self.painted[0] != key:
+            self.painted = (key, [DrawText(self.x, self.y, self.word, self.font, color)])
+        return self.painted[1]
@@ -1,6 +1,9 @@
+import hashlib
 import html
 import random
 import socket
+import threading
+import time
 from urllib import parse
 
 LOGINS = {
@@ -9,6 +12,7 @@ LOGINS = {
     "": ""
 }
 SESSIONS = {}
+CACHE_MAX_AGE = 60  # seconds
 
 
 def handle_connection(conx: socket.socket):
@@ -38,11 +42,24 @@ def handle_connection(conx: socket.socket):
 
     session = SESSIONS.setdefault(token, {})
     status, body = do_request(session, method, url, headers, body)
+
+    # scripts and stylesheets may be cached by the browser and revalidated with their etag
+    etag = None
+    if method == "GET" and url.endswith((".js", ".css")) and status == "200 OK":
+        etag = '"{}"'.format(hashlib.sha1(body.encode("utf8")).hexdigest())
+        if headers.get("if-none-match") == etag:
+            status, body = "304 Not Modified", ""
+
     response = "HTTP/1.0 {}\r\n".format(status)
 
-    csp = "default-src http://localhost:8000"
+    port = conx.getsockname()[1]
+    csp = "default-src http://localhost:{}".format(port)
     response += "Content-Security-Policy: {}\r\n".format(csp)
 
+    if etag:
+        response += "Cache-Control: max-age={}\r\n".format(CACHE_MAX_AGE)
+        response += "ETag: {}\r\n".format(etag)
+
     if "cookie" not in headers:
         template = "Set-Cookie: token={}; SameSite=Lax\r\n"
         response += template.format(token)
@@ -75,6 +92,8 @@ def do_request(session, method, url, headers, body) -> tuple[str, str]:
     elif method == "GET" and url == "/comment.css":
         with open("server/comment.css") as f:
             return "200 OK", f.read()
+    elif method == "GET" and url.startswith("/subresources/"):
+        return subresources(url[len("/subresources/"):])
     elif method == "POST" and url == "/add":
         params = form_decode(body)
         add_entry(session, params)
@@ -152,22 +171,54 @@ def add_entry(session, params: dict):
         ENTRIES.append((params['guest'], session["user"]))
 
 
+# page with many scripts and stylesheets, e.g. for timing subresource loading
+def subresources(path) -> tuple[str, str]:
+    if path.endswith(".js"):
+        name = path[:-len(".js")]
+        return "200 OK", "var script_{} = true;".format(name)
+    elif path.endswith(".css"):
+        name = path[:-len(".css")]
+        return "200 OK", "p {{ color: black; }} .c{} {{ color: black; }}".format(name)
+    elif not path.isdigit():
+        return "404 Not Found", not_found("/subresources/" + path, "GET")
+
+    out = "<!doctype html>"
+    for i in range(int(path)):
+        out += "<script src=/subresources/{}.js></script>".format(i)
+        out += "<link rel=stylesheet href=/subresources/{}.css>".format(i)
+    out += "<p>Page with {} scripts and {} stylesheets</p>".format(path, path)
+    return "200 OK", out
+
+
 def not_found(url, method) -> str:
     out = "<!doctype html>"
     out += "<h1>{} {} not found!</h1>".format(method, url)
     return out
 
 
-if __name__ == "__main__":
+def serve(port: int = 8000, delay: float = 0, verbose: bool = True) -> None:
     s = socket.socket(
         family=socket.AF_INET,
         type=socket.SOCK_STREAM,
         proto=socket.IPPROTO_TCP)
     s.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
-    s.bind(('', 8000))
+    s.bind(('', port))
     s.listen()
 
     while True:
         conx, addr = s.accept()
-        print("Received connection from", addr)
-        handle_connection(conx)
+        if verbose:
+            print("Received connection from", addr)
+        # one thread per connection, so parallel requests don't wait for each other
+        threading.Thread(target=handle_delayed, args=(conx, delay), daemon=True).start()
+
+
+# delay simulates the network round trip of a remote server
+def handle_delayed(conx: socket.socket, delay: float) -> None:
+    if delay:
+        time.sleep(delay)
+    handle_connection(conx)
+
+
+if __name__ == "__main__":
+    serve()
@@ -1,16 +1,42 @@
+import re
+from collections import OrderedDict
+
 from src.dom.Element import Element
 from src.dom.Text import Text
+from src.styling.ComputedStyle import DEFAULT_STYLE, INHERITED_PROPERTIES, ComputedStyle
 from src.styling.DescendantSelector import DescendantSelector
+from src.styling.RuleIndex import RuleIndex
 from src.styling.TagSelector import TagSelector
 
-INHERITED_PROPERTIES = {
-    "font-size": "16px",
-    "font-style": "normal",
-    "font-weight": "normal",
-    "color": "black",
-}
+
+# a word is a run of characters that are str.isalnum() or one of #-.%,
+# whitespace is what str.isspace() accepts
+WORD = re.compile(r"(?:[^\W_]|[#.%-])+")  # \w is str.isalnum() plus "_"
+WHITESPACE = re.compile(r"\s*")  # \s is str.isspace()
+DECLARATION_END = re.compile(r"[;}]")
+
+# The fast patterns only know ascii words and whitespace, and allow "_" because one
+# character class is much faster. Where they stop at another character, the rule or
+# declaration doesn't match; what they match with a "_" in it is left to the token
+# by token path. Words are maximal runs, so they can't be split differently than there
+FAST_WORD = r"[\w#.%-]+"
+FAST_DECLARATION = r"({0})\s*:\s*({0})\s*;".format(FAST_WORD)
+DECLARATION = re.compile(FAST_DECLARATION, re.ASCII)
+DECLARATIONS = re.compile(r"(?:{}\s*)*".format(FAST_DECLARATION), re.ASCII)
+RULE = re.compile(r"({0}(?:\s+{0})*)\s*\{{\s*((?:{1}\s*)*)\}}\s*".format(FAST_WORD, FAST_DECLARATION),
+                  re.ASCII)
+
+LEAVE = object()  # on the stack of style() when all children of an element are styled
+
+INLINE_STYLE_CACHE_SIZE = 4096  # distinct style attributes kept parsed, 0 parses every one again
+INLINE_STYLES: OrderedDict[str, dict[str, str]] = OrderedDict()  # least recently used first
+SELECTOR_CACHE_SIZE = 1024  # distinct selectors from scripts kept parsed
+SELECTORS: OrderedDict[str, TagSelector | DescendantSelector] = OrderedDict()  # least recently used first
 
 
+# matches whole rules and declarations with regular expressions and only goes token by token
+# where they fail. A broken rule or declaration is skipped up to the next } or ;
+# where parsing picks up again
 class CSSParser:
     def __init__(self, s: str) -> None:
         self.s = s
@@ -18,129 +44,223 @@ class CSSParser:
 
     def parse(self) -> list[tuple[TagSelector | DescendantSelector, dict[str, str]]]:
         rules = []
-        while self.i < len(self.s):
-            try:
-                self.whitespace()
-                selector = self.selector()
-                self.literal("{")
+        s = self.s
+        while self.i < len(s):
+            self.whitespace()
+            match = RULE.match(s, self.i)
+            if match and "_" not in match.group():
+                words = match.group(1).split()
+                selector = TagSelector(words[0].casefold())
+                for word in words[1:]:
+                    selector = DescendantSelector(selector, TagSelector(word.casefold()))
+                rules.append((selector, self.declarations(match.group(2))))
+                self.i = match.end()
+                continue
+
+            selector = self.try_selector()
+            if selector is not None and self.literal("{"):
                 self.whitespace()
                 body = self.body()
-                self.literal("}")
-                rules.append((selector, body))
-            except Exception:
-                why = self.ignore_until(["}"])
-                if why == "}":
-                    self.literal("}")
-                    self.whitespace()
-                else:
-                    break
+                if self.literal("}"):
+                    rules.append((selector, body))
+                    continue
+
+            end = s.find("}", self.i)
+            if end < 0:
+                self.i = len(s)
+                break
+            self.i = end + 1
+            self.whitespace()
 
         return rules
 
     def selector(self) -> TagSelector | DescendantSelector:
-        out = TagSelector(self.word().casefold())
+        out = self.try_selector()
+        if out is None:
+            raise Exception("Parsing error: could not find a word")
+        return out
+
+    # None if there is no valid selector at self.i, which then is where parsing failed
+    def try_selector(self) -> TagSelector | DescendantSelector | None:
+        word = self.word()
+        if word is None:
+            return None
+        out = TagSelector(word.casefold())
         self.whitespace()
-        while self.i < len(self.s) and self.s[self.i] != "{":
-            tag = self.word()
-            descendant = TagSelector(tag.casefold())
-            out = DescendantSelector(out, descendant)
+        s = self.s
+        while self.i < len(s) and s[self.i] != "{":
+            word = self.word()
+            if word is None:
+                return None
+            out = DescendantSelector(out, TagSelector(word.casefold()))
             self.whitespace()
         return out
 
     def body(self) -> dict[str, str]:
         pairs = {}
-        while self.i < len(self.s) and self.s[self.i] != "}":
-            try:
-                prop, val = self.pair()
-                pairs[prop.casefold()] = val
-                self.whitespace()
-                self.literal(";")
+        s = self.s
+        while self.i < len(s) and s[self.i] != "}":
+            match = DECLARATIONS.match(s, self.i)
+            if match.end() > self.i and "_" not in match.group():
+                pairs.update(self.declarations(match.group()))
+                self.i = match.end()
+                self.whitespace()  # the pattern leaves other than ascii whitespace
+                continue
+
+            prop = self.word()
+            if prop is not None:
                 self.whitespace()
-            except Exception:
-                why = self.ignore_until([";", "}"])
-                if why == ";":
-                    self.literal(";")
+                if self.literal(":"):
                     self.whitespace()
-                else:
-                    # why == None: end of the string
-                    # why == "}": end of the selector bodys
-                    break
+                    val = self.word()
+                    if val is not None:
+                        pairs[prop.casefold()] = val
+                        self.whitespace()
+                        if self.literal(";"):
+                            self.whitespace()
+                            continue
+
+            end = DECLARATION_END.search(s, self.i)
+            if end is None:  # end of the string
+                self.i = len(s)
+                break
+            self.i = end.start()
+            if s[self.i] == "}":  # end of the selector body
+                break
+            self.i += 1
+            self.whitespace()
 
         return pairs
 
-    def pair(self) -> tuple[str, str]:
-        prop = self.word()
-        self.whitespace()
-        self.literal(":")
-        self.whitespace()
-        val = self.word()
-        return prop.casefold(), val
-
-    def ignore_until(self, chars: list[str]) -> str | None:
-        while self.i < len(self.s):
-            if self.s[self.i] in chars:
-                return self.s[self.i]
-            else:
-                self.i += 1
-        return None
-
-    def word(self):
-        start = self.i
-        while self.i < len(self.s):
-            if self.s[self.i].isalnum() or self.s[self.i] in "#-.%":
-                self.i += 1
-            else:
-                break
-        if not (self.i > start):
-            raise Exception("Parsing error: could not find a word")
-        return self.s[start:self.i]
+    @staticmethod
+    def declarations(text: str) -> dict[str, str]:
+        return {prop.casefold(): val for prop, val in DECLARATION.findall(text)}
 
-    def literal(self, literal: str):
-        if not (self.i < len(self.s) and self.s[self.i] == literal):
-            raise Exception("Parsing error")
-        self.i += 1
+    # None if there is no word at self.i
+    def word(self) -> str | None:
+        match = WORD.match(self.s, self.i)
+        if match is None:
+            return None
+        self.i = match.end()
+        return match.group()
 
-    def whitespace(self):
-        while self.i < len(self.s) and self.s[self.i].isspace():
+    def literal(self, literal: str) -> bool:
+        if self.i < len(self.s) and self.s[self.i] == literal:
             self.i += 1
+            return True
+        return False
+
+    def whitespace(self) -> None:
+        self.i = WHITESPACE.match(self.s, self.i).end()
+
 
+# only restyles nodes marked dirty and the children of nodes whose style changed,
+# force restyles everything, e.g. when the rules changed. Returns the number of restyled nodes.
+# ancestors counts the tags on the path from the root to node, so descendant selectors
+# can be rejected without walking up the tree
+def style(node: Element | Text, rules: RuleIndex, ancestors: dict[str, int] | None = None,
+          force: bool = False) -> int:
+    if ancestors is None:
+        ancestors = {}
+        parent = node.parent
+        while parent:
+            ancestors[parent.tag] = ancestors.get(parent.tag, 0) + 1
+            parent = parent.parent
 
-def style(node: Element | Text, rules: list[tuple[TagSelector | DescendantSelector, dict[str, str]]]) -> None:
-    node.style = {}
+    restyled = 0
+    # depth first with an explicit stack, so deep documents can't hit the recursion limit.
+    # LEAVE followed by a tag marks where the children of an element with that tag end
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        if node is LEAVE:
+            ancestors[stack.pop()] -= 1
+            continue
+
+        changed = False
+        if force or node.style_dirty:
+            previous = node.style
+            compute_style(node, rules, ancestors)
+            node.style_dirty = False
+            changed = node.style is not previous  # styles are interned, so identity is enough
+            if changed:
+                node.mark_layout_dirty()
+            restyled += 1
+
+        # style the children next
+        if force or changed or node.children_style_dirty:
+            if node.children:
+                ancestors[node.tag] = ancestors.get(node.tag, 0) + 1
+                stack.append(node.tag)
+                stack.append(LEAVE)
+                if changed:  # children inherit from this node
+                    for child in node.children:
+                        child.style_dirty = True
+                stack.extend(reversed(node.children))
+            if node.children_style_dirty:
+                node.children_style_dirty = False
+    return restyled
 
+
+def compute_style(node: Element | Text, rules: RuleIndex, ancestors: dict[str, int]) -> None:
     # inherit or set default styles
-    for property, default_value in INHERITED_PROPERTIES.items():
-        if node.parent:
-            node.style[property] = node.parent.style[property]
-        else:
-            node.style[property] = default_value
+    if node.parent:
+        inherited = node.parent.style.inherited()
+    else:
+        inherited = DEFAULT_STYLE
+    properties = None  # only copied from the inherited style when something overrides it
 
     # apply rules from stylesheets
-    for selector, body in rules:
-        if not selector.matches(node):
+    for selector, body in rules.candidates(node):
+        if not selector.matches(node, ancestors):
             continue
-        for property, value in body.items():
-            node.style[property] = value
+        if properties is None:
+            properties = dict(inherited)
+        properties.update(body)
 
     # html style attribute overrides CSS rules
     if isinstance(node, Element) and "style" in node.attributes:
-        pairs = CSSParser(node.attributes["style"]).body()
-        for property, value in pairs.items():
-            node.style[property] = value
-
-    # resolve font-size percentages
-    if node.style["font-size"].endswith("%"):
-        if node.parent:
-            parent_font_size = node.parent.style["font-size"]
-        else:
-            parent_font_size = INHERITED_PROPERTIES["font-size"]
-        node_pct = float(node.style["font-size"][:-1]) / 100
-        parent_px = float(parent_font_size[:-2])
-        node.style["font-size"] = str(node_pct * parent_px) + "px"
-
-    # recursively style children
-    for child in node.children:
-        style(child, rules)
+        pairs = inline_style(node.attributes["style"])
+        if properties is None:
+            properties = dict(inherited)
+        properties.update(pairs)
+
+    if properties is None:
+        node.style = inherited  # shared with every other node that just inherits the same values
+    else:
+        # resolve font-size percentages
+        if properties["font-size"].endswith("%"):
+            node_pct = float(properties["font-size"][:-1]) / 100
+            parent_px = float(inherited["font-size"][:-2])
+            properties["font-size"] = str(node_pct * parent_px) + "px"
+        node.style = ComputedStyle.intern(properties)
+
+
+# the declarations of a style attribute, shared by every node with the same attribute
+# so they must not be changed
+def inline_style(text: str) -> dict[str, str]:
+    pairs = INLINE_STYLES.get(text)
+    if pairs is None:
+        pairs = CSSParser(text).body()
+        INLINE_STYLES[text] = pairs
+        if len(INLINE_STYLES) > INLINE_STYLE_CACHE_SIZE:
+            INLINE_STYLES.popitem(last=False)
+    else:
+        INLINE_STYLES.move_to_end(text)
+    return pairs
+
+
+# the selector of a query from a script, raises like CSSParser.selector if it is invalid
+def parse_selector(text: str) -> TagSelector | DescendantSelector:
+    selector = SELECTORS.get(text)
+    if selector is None:
+        selector = CSSParser(text).selector()
+        SELECTORS[text] = selector
+        if len(SELECTORS) > SELECTOR_CACHE_SIZE:
+            SELECTORS.popitem(last=False)
+    else:
+        SELECTORS.move_to_end(text)
+    return selector
 
 
 def cascade_priority(rule: tuple[TagSelector | DescendantSelector, dict[str, str]]) -> int:
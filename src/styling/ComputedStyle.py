@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+import weakref
+from collections.abc import Mapping
+
+from src.styling.Fonts import get_font
+
+INHERITED_PROPERTIES = {
+    "font-size": "16px",
+    "font-style": "normal",
+    "font-weight": "normal",
+    "color": "black",
+}
+
+
+class ComputedStyle(Mapping):
+    __slots__ = ("properties", "inherited_style", "cached_font", "__weakref__")
+
+    # all live styles by their properties, so nodes with the same computed values share one object
+    INTERNED: weakref.WeakValueDictionary[frozenset, ComputedStyle] = weakref.WeakValueDictionary()
+
+    def __init__(self, properties: dict[str, str]) -> None:
+        self.properties = properties
+        self.inherited_style = None
+        self.cached_font = None
+
+    @classmethod
+    def intern(cls, properties: dict[str, str]) -> ComputedStyle:
+        key = frozenset(properties.items())
+        style = cls.INTERNED.get(key)
+        if style is None:
+            style = cls(dict(properties))
+            cls.INTERNED[key] = style
+        return style
+
+    def __getitem__(self, property: str) -> str:
+        return self.properties[property]
+
+    def __iter__(self):
+        return iter(self.properties)
+
+    def __len__(self) -> int:
+        return len(self.properties)
+
+    def __repr__(self):
+        return "ComputedStyle({})".format(self.properties)
+
+    # the part of this style that children inherit
+    def inherited(self) -> ComputedStyle:
+        if self.inherited_style is None:
+            self.inherited_style = ComputedStyle.intern(
+                {property: self.properties[property] for property in INHERITED_PROPERTIES})
+        return self.inherited_style
+
+    def font(self):
+        if self.cached_font is None:
+            weight = self.properties["font-weight"]
+            style = self.properties["font-style"]
+            if style == "normal":
+                style = "roman"
+            size = int(float(self.properties["font-size"][:-2]) * .75)  # convert css px to tkinter font size
+            self.cached_font = get_font(size, weight, style)
+        return self.cached_font
+
+
+DEFAULT_STYLE = ComputedStyle.intern(INHERITED_PROPERTIES)
@@ -10,12 +10,25 @@ class DescendantSelector:
                  descendant: TagSelector):
         self.ancestor = ancestor
         self.descendant = descendant
+        self.rightmost_tag = descendant.rightmost_tag
         self.priority = ancestor.priority + descendant.priority
+        # every tag left of the descendant has to appear somewhere among the node's ancestors
+        if isinstance(ancestor, DescendantSelector):
+            self.ancestor_tags = ancestor.ancestor_tags | {ancestor.rightmost_tag}
+        else:
+            self.ancestor_tags = frozenset([ancestor.tag])
 
-    def matches(self, node: Element | Text) -> bool:
+    # ancestors counts the tags of all ancestors of node, if the caller keeps track of them
+    def matches(self, node: Element | Text, ancestors: dict[str, int] | None = None) -> bool:
         if not self.descendant.matches(node):
             return False
 
+        # cheap rejection without walking up the tree
+        if ancestors is not None:
+            for tag in self.ancestor_tags:
+                if not ancestors.get(tag):
+                    return False
+
         # Laufe so lange nach oben, bis man passenden Vorfahren findet
         while node.parent:
             if self.ancestor.matches(node.parent):
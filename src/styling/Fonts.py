@@ -1,15 +1,27 @@
-import tkinter
-from tkinter.font import Font
-from typing import Literal
+from typing import Callable, Literal
 
 FONTS = {}
 
 
-def get_font(size: int, weight: Literal["normal", "bold"], style: Literal["roman", "italic"]) -> Font:
+def tk_font(size: int, weight: str, style: str):
+    # imported here, so pages can be rendered headless without Tk installed
+    from src.styling.TkFont import TkFont
+    return TkFont((size, weight, style), size=size, weight=weight, slant=style)
+
+
+# creates the font for (size, weight, style), the result needs measure, metrics and space_width
+FONT_PROVIDER: Callable[[int, str, str], object] = tk_font
+
+
+# has to be called before anything is styled, computed styles keep their fonts
+def set_font_provider(provider: Callable[[int, str, str], object]) -> None:
+    global FONT_PROVIDER
+    FONT_PROVIDER = provider
+    FONTS.clear()
+
+
+def get_font(size: int, weight: Literal["normal", "bold"], style: Literal["roman", "italic"]):
     key = (size, weight, style)
     if key not in FONTS:
-        font = tkinter.font.Font(size=size, weight=weight,
-                                 slant=style)
-        label = tkinter.Label(font=font)
-        FONTS[key] = (font, label)
-    return FONTS[key][0]
+        FONTS[key] = FONT_PROVIDER(size, weight, style)
+    return FONTS[key]
@@ -0,0 +1,22 @@
+from src.dom.Element import Element
+from src.dom.Text import Text
+from src.styling.DescendantSelector import DescendantSelector
+from src.styling.TagSelector import TagSelector
+
+NO_RULES = []
+
+
+class RuleIndex:
+    # rules have to be in cascade order already, each bucket keeps that order
+    def __init__(self, rules: list[tuple[TagSelector | DescendantSelector, dict[str, str]]]) -> None:
+        self.rules = rules
+        self.by_tag: dict[str, list[tuple[TagSelector | DescendantSelector, dict[str, str]]]] = {}
+        for rule in rules:
+            selector, body = rule
+            self.by_tag.setdefault(selector.rightmost_tag, []).append(rule)
+
+    # the only rules that can match the node, every selector ends in a tag selector
+    def candidates(self, node: Element | Text) -> list[tuple[TagSelector | DescendantSelector, dict[str, str]]]:
+        if isinstance(node, Text):
+            return NO_RULES
+        return self.by_tag.get(node.tag, NO_RULES)
@@ -0,0 +1,71 @@
+import hashlib
+from collections import OrderedDict
+
+from src.styling.CSSParser import CSSParser, cascade_priority
+from src.styling.DescendantSelector import DescendantSelector
+from src.styling.RuleIndex import RuleIndex
+from src.styling.TagSelector import TagSelector
+
+STYLE_SHEET_CACHE_SIZE = 256  # parsed stylesheets kept, 0 parses every stylesheet again
+CASCADE_CACHE_SIZE = 32  # sorted and indexed rule sets kept
+
+Rule = tuple[TagSelector | DescendantSelector, dict[str, str]]
+
+
+class StyleSheet:
+    # parsed once and shared by every tab that loads the same text, so the rules must not be changed
+    def __init__(self, key: str, rules: list[Rule]) -> None:
+        self.key = key
+        self.rules = rules
+
+
+class StyleSheetCache:
+    def __init__(self, max_sheets: int = STYLE_SHEET_CACHE_SIZE,
+                 max_cascades: int = CASCADE_CACHE_SIZE) -> None:
+        self.max_sheets = max_sheets
+        self.max_cascades = max_cascades
+        self.sheets: OrderedDict[str, StyleSheet] = OrderedDict()  # least recently used first
+        self.cascades: OrderedDict[tuple[str, ...], RuleIndex] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def key(text: str) -> str:
+        return hashlib.sha1(text.encode("utf-8", "surrogatepass")).hexdigest()
+
+    def parse(self, text: str) -> StyleSheet:
+        key = self.key(text)
+        sheet = self.sheets.get(key)
+        if sheet is not None:
+            self.hits += 1
+            self.sheets.move_to_end(key)
+            return sheet
+        self.misses += 1
+        sheet = StyleSheet(key, CSSParser(text).parse())
+        self.sheets[key] = sheet
+        if len(self.sheets) > self.max_sheets:
+            self.sheets.popitem(last=False)
+        return sheet
+
+    # the rules of the sheets in cascade order and indexed by tag. The sort is stable,
+    # so the same sheets in the same order always give the same cascade
+    def cascade(self, sheets: list[StyleSheet]) -> RuleIndex:
+        key = tuple(sheet.key for sheet in sheets)
+        rules = self.cascades.get(key)
+        if rules is not None:
+            self.cascades.move_to_end(key)
+            return rules
+        rules = RuleIndex(sorted((rule for sheet in sheets for rule in sheet.rules), key=cascade_priority))
+        self.cascades[key] = rules
+        if len(self.cascades) > self.max_cascades:
+            self.cascades.popitem(last=False)
+        return rules
+
+    def clear(self) -> None:
+        self.sheets.clear()
+        self.cascades.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+STYLE_SHEET_CACHE = StyleSheetCache()
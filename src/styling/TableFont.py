@@ -0,0 +1,60 @@
+import json
+
+from src.user_agent.Profiler import PROFILER
+
+# em fractions, roughly those of a sans-serif font
+DEFAULT_METRICS = {
+    "ascent": 0.8,
+    "descent": 0.2,
+    "default_width": 0.5,
+    "bold_scale": 1.1,  # bold glyphs are wider
+    "widths": {},
+}
+
+
+class TableFont:
+    # measures text without Tk: every character advances by its width from the table,
+    # all values are fractions of the font size
+    def __init__(self, key: tuple, table: dict) -> None:
+        self.key = key
+        size, weight, style = key
+        em = size / .75  # tkinter sizes are points, measurements are pixels
+        scale = em * (table["bold_scale"] if weight == "bold" else 1)
+        self.widths = {char: width * scale for char, width in table["widths"].items()}
+        self.default_width = table["default_width"] * scale
+        ascent = round(table["ascent"] * em)
+        descent = round(table["descent"] * em)
+        self.cached_metrics = {"ascent": ascent, "descent": descent,
+                               "linespace": ascent + descent, "fixed": int(not table["widths"])}
+        self.space_width = self.measure(" ")
+
+    def measure(self, text: str) -> int:
+        if PROFILER.enabled:
+            PROFILER.count("font measures")
+        widths = self.widths
+        default = self.default_width
+        return round(sum(widths.get(char, default) for char in text))
+
+    def metrics(self, *options):
+        if options:
+            return self.cached_metrics[options[0]]
+        return dict(self.cached_metrics)
+
+
+class TableFontProvider:
+    def __init__(self, table: dict | None = None) -> None:
+        self.table = dict(DEFAULT_METRICS, **(table or {}))
+
+    # every character is equally wide, e.g. for comparable results on every machine
+    @classmethod
+    def fixed(cls, advance: float = 0.6) -> "TableFontProvider":
+        return cls({"default_width": advance, "bold_scale": 1})
+
+    # a json file with any of the keys of DEFAULT_METRICS
+    @classmethod
+    def load(cls, path: str) -> "TableFontProvider":
+        with open(path) as f:
+            return cls(json.load(f))
+
+    def __call__(self, size: int, weight: str, style: str) -> TableFont:
+        return TableFont((size, weight, style), self.table)
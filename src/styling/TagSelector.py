@@ -5,8 +5,9 @@ from src.dom.Text import Text
 class TagSelector:
     def __init__(self, tag: str):
         self.tag = tag
+        self.rightmost_tag = tag  # used to index rules by the tag a node needs to have
         self.priority = 1
 
-    def matches(self, node: Element | Text) -> bool:
+    def matches(self, node: Element | Text, ancestors: dict[str, int] | None = None) -> bool:
         # Text Element hat ja keinen Tag
         return isinstance(node, Element) and self.tag == node.tag
@@ -0,0 +1,41 @@
+import tkinter
+import tkinter.font
+from collections import OrderedDict
+
+from src.user_agent.Profiler import PROFILER
+
+MEASURE_CACHE_SIZE = 100_000  # distinct (font, text) widths kept, 0 measures everything with Tk
+MEASUREMENTS: OrderedDict[tuple, int] = OrderedDict()  # least recently used first
+
+
+class TkFont(tkinter.font.Font):
+    # every measure and metrics call on a plain Font is a round trip to Tcl/Tk
+    def __init__(self, key: tuple, **options) -> None:
+        super().__init__(**options)
+        self.key = key
+        self.label = tkinter.Label(font=self)  # makes metrics calls faster
+        self.cached_metrics = super().metrics()  # ascent, descent, linespace and fixed at once
+        self.space_width = super().measure(" ")
+
+    def measure(self, text: str, displayof=None) -> int:
+        key = (self.key, text)
+        width = MEASUREMENTS.get(key)
+        if PROFILER.enabled:
+            PROFILER.count("font measures")
+            if width is None:
+                PROFILER.count("tk measures")
+        if width is None:
+            width = super().measure(text, displayof)
+            MEASUREMENTS[key] = width
+            if len(MEASUREMENTS) > MEASURE_CACHE_SIZE:
+                MEASUREMENTS.popitem(last=False)
+        else:
+            MEASUREMENTS.move_to_end(key)
+        return width
+
+    def metrics(self, *options, **kw):
+        if kw:
+            return super().metrics(*options, **kw)
+        if options:
+            return self.cached_metrics[options[0]]
+        return dict(self.cached_metrics)
@@ -0,0 +1,13 @@
+# Run from src/: python -m pytest -q tests
+import os
+import sys
+
+SRC = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+# modules in user_agent import each other without the src. prefix
+sys.path[:0] = [os.path.dirname(SRC), os.path.join(SRC, "user_agent")]
+os.chdir(SRC)  # browser.css and runtime.js are opened relative to src/
+
+from src.styling.Fonts import set_font_provider
+from src.styling.TableFont import TableFontProvider
+
+set_font_provider(TableFontProvider.fixed())  # no Tk, widths don't depend on the installed fonts
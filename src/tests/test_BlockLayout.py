@@ -0,0 +1,80 @@
+import random
+
+from Tab import Tab
+from URL import URL
+from src.benchmarks.Documents import forms_document, prose_document
+from src.layout.DocumentLayout import DocumentLayout
+from src.layout.TextLayout import TextLayout
+from src.user_agent.Utils import paint_tree
+
+FRAGMENTS = ["", "plain text", "<b>bold</b> and <i>italic</i>", "<p>a new <span>paragraph</span></p>",
+             "<div><p>nested</p><p>blocks</p></div>", "line<br>break", "<input name=x value=typed>"]
+STYLES = ["font-size:150%", "font-size:50%", "font-weight:bold", "font-style:italic",
+          "background-color:yellow", "color:red"]
+
+
+def signature(document: DocumentLayout) -> list:
+    out = []
+    stack = [document]
+    while stack:
+        layout_object = stack.pop()
+        word = layout_object.word if isinstance(layout_object, TextLayout) else None
+        out.append((type(layout_object).__name__, word, layout_object.x, layout_object.y, layout_object.width, layout_object.height))
+        stack.extend(reversed(layout_object.children))
+    return out
+
+
+def commands(document: DocumentLayout) -> list:
+    display_list = []
+    paint_tree(document, display_list)
+    return [(type(cmd).__name__, cmd.rect.left, cmd.rect.top, cmd.rect.right, cmd.rect.bottom,
+             getattr(cmd, "text", None)) for cmd in display_list]
+
+
+def elements(root) -> list:
+    out = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        if hasattr(node, "tag"):
+            out.append(node)
+        stack.extend(node.children)
+    return out
+
+
+def test_incremental_layout_matches_a_fresh_one(tmp_path) -> None:
+    rng = random.Random(0)
+    path = tmp_path / "page.html"
+    path.write_text(prose_document(8 * 1024).replace("</body>", forms_document(3)[12:]))
+    tab = Tab(600)
+    tab.load(URL("file://{}".format(path)))
+
+    for step in range(60):
+        candidates = [node for node in elements(tab.nodes) if node.tag not in ["html", "head", "body"]]
+        node = rng.choice(candidates)
+        if rng.random() < 0.5:
+            node.attributes["style"] = rng.choice(STYLES)
+            node.mark_style_dirty()
+            tab.render()
+        else:
+            tab.js.innerHTML_set(tab.js.get_handle(node), rng.choice(FRAGMENTS))  # renders
+
+        fresh = DocumentLayout(tab.nodes)
+        fresh.layout()
+        assert signature(tab.document) == signature(fresh), step
+        assert commands(tab.document) == commands(fresh), step
+
+
+def test_typing_keeps_the_layout(tmp_path) -> None:
+    path = tmp_path / "form.html"
+    path.write_text(forms_document(5))
+    tab = Tab(600)
+    tab.load(URL("file://{}".format(path)))
+    before = signature(tab.document)
+    blocks = list(tab.document.children[0].children)
+    focus = next(node for node in elements(tab.nodes) if node.tag == "input")
+    tab.focus = focus
+    for char in "typed":
+        tab.keypress(char)
+    assert signature(tab.document) == before
+    assert tab.document.children[0].children == blocks  # the same layout objects
@@ -0,0 +1,287 @@
+import random
+import re
+import sys
+
+from src.benchmarks.Documents import INLINE_TAGS, deep_document, prose_document, stylesheet
+from src.dom.HTMLParser import HTMLParser
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.DescendantSelector import DescendantSelector
+from src.styling.RuleIndex import RuleIndex
+from src.styling.TagSelector import TagSelector
+
+NOISE = list("{}:;_ \t\n#-.%,>*()'\"/\\@!") + [" ", " ", "é", "ß", "٣",
+                                              "Ⅷ", "½", "中", "\U0001d7d8", "İ"]
+
+
+class CharacterParser:
+    # how CSSParser worked before the regular expressions, exceptions signal the errors it recovers from
+    def __init__(self, s: str) -> None:
+        self.s = s
+        self.i = 0
+
+    def parse(self) -> list:
+        rules = []
+        while self.i < len(self.s):
+            try:
+                self.whitespace()
+                selector = self.selector()
+                self.literal("{")
+                self.whitespace()
+                body = self.body()
+                self.literal("}")
+                rules.append((selector, body))
+            except Exception:
+                why = self.ignore_until(["}"])
+                if why == "}":
+                    self.literal("}")
+                    self.whitespace()
+                else:
+                    break
+        return rules
+
+    def selector(self):
+        out = TagSelector(self.word().casefold())
+        self.whitespace()
+        while self.i < len(self.s) and self.s[self.i] != "{":
+            tag = self.word()
+            out = DescendantSelector(out, TagSelector(tag.casefold()))
+            self.whitespace()
+        return out
+
+    def body(self) -> dict:
+        pairs = {}
+        while self.i < len(self.s) and self.s[self.i] != "}":
+            try:
+                prop, val = self.pair()
+                pairs[prop.casefold()] = val
+                self.whitespace()
+                self.literal(";")
+                self.whitespace()
+            except Exception:
+                why = self.ignore_until([";", "}"])
+                if why == ";":
+                    self.literal(";")
+                    self.whitespace()
+                else:
+                    break
+        return pairs
+
+    def pair(self) -> tuple:
+        prop = self.word()
+        self.whitespace()
+        self.literal(":")
+        self.whitespace()
+        val = self.word()
+        return prop.casefold(), val
+
+    def ignore_until(self, chars: list):
+        while self.i < len(self.s):
+            if self.s[self.i] in chars:
+                return self.s[self.i]
+            self.i += 1
+        return None
+
+    def word(self) -> str:
+        start = self.i
+        while self.i < len(self.s):
+            if self.s[self.i].isalnum() or self.s[self.i] in "#-.%":
+                self.i += 1
+            else:
+                break
+        if not (self.i > start):
+            raise Exception("Parsing error: could not find a word")
+        return self.s[start:self.i]
+
+    def literal(self, literal: str) -> None:
+        if not (self.i < len(self.s) and self.s[self.i] == literal):
+            raise Exception("Parsing error")
+        self.i += 1
+
+    def whitespace(self) -> None:
+        while self.i < len(self.s) and self.s[self.i].isspace():
+            self.i += 1
+
+
+def index(css: str) -> RuleIndex:
+    return RuleIndex(sorted(CSSParser(css).parse(), key=cascade_priority))
+
+
+def styled(html: str, css: str):
+    root = HTMLParser(html).parse()
+    style(root, index(css), force=True)
+    return root
+
+
+def all_nodes(root) -> list:
+    out = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        out.append(node)
+        stack.extend(reversed(node.children))
+    return out
+
+
+def test_cascade() -> None:
+    root = styled("<div><p>a</p></div><p>b<i>c</i></p>",
+                  "p { color: red; } div p { color: blue; } p { font-weight: bold; } i { color: green; }")
+    body = root.children[0]
+    inner, outer = body.children[0].children[0], body.children[1]
+    assert inner.style["color"] == "blue"  # more specific, although it comes first
+    assert outer.style["color"] == "red"
+    assert inner.style["font-weight"] == outer.style["font-weight"] == "bold"
+    assert outer.children[1].style["color"] == "green"
+    assert outer.children[0].style["color"] == "red"  # text inherits
+    assert body.style["color"] == "black"
+
+
+def test_later_rule_wins_at_equal_priority() -> None:
+    root = styled("<p>a</p>", "p { color: red; } p { color: blue; }")
+    assert root.children[0].children[0].style["color"] == "blue"
+
+
+def test_style_attribute_wins() -> None:
+    root = styled("<p style=color:green;font-size:50%>a</p>", "p { color: red; font-size: 20px; }")
+    p = root.children[0].children[0]
+    assert p.style["color"] == "green"
+    assert p.style["font-size"] == "8.0px"  # half of the inherited 16px
+
+
+def test_candidates_are_the_rules_for_the_tag() -> None:
+    rules = index(stylesheet(300))
+    root = HTMLParser(prose_document(10 * 1024)).parse()
+    for node in all_nodes(root):
+        # the index keeps the cascade order of the rules it was built from
+        expected = [rule for rule in rules.rules if getattr(node, "tag", None) == rule[0].rightmost_tag]
+        assert rules.candidates(node) == expected
+
+
+def test_ancestor_counts_agree_with_walking_up() -> None:
+    rules = CSSParser(stylesheet(300)).parse()
+    root = HTMLParser(deep_document(200, tags=["div", "p", "ul", "li"] + INLINE_TAGS)).parse()
+    stack = [(root, {})]
+    while stack:
+        node, ancestors = stack.pop()
+        for selector, body in rules:
+            assert selector.matches(node, ancestors) == selector.matches(node)
+        if node.children:
+            inner = dict(ancestors)
+            inner[node.tag] = inner.get(node.tag, 0) + 1
+            stack.extend((child, inner) for child in node.children)
+
+
+def test_descendant_selectors() -> None:
+    root = styled("<div><ul><li><b>x</b></li></ul></div><b>y</b>",
+                  "div b { color: red; } ul li b { font-style: italic; } p b { color: blue; }")
+    body = root.children[0]
+    inner, outer = body.children[0].children[0].children[0].children[0], body.children[1]
+    assert inner.style["color"] == "red" and inner.style["font-style"] == "italic"
+    assert outer.style["color"] == "black" and outer.style["font-style"] == "normal"
+
+
+def signature(selector) -> tuple:
+    if isinstance(selector, DescendantSelector):
+        return signature(selector.ancestor) + signature(selector.descendant)
+    return (selector.tag,)
+
+
+def parsed(css: str) -> list:
+    return [(signature(selector), body) for selector, body in CSSParser(css).parse()]
+
+
+def outcome(parser, method: str):
+    try:
+        result = getattr(parser, method)()
+    except Exception:
+        return "error", parser.i
+    if method == "parse":
+        result = [(signature(selector), body) for selector, body in result]
+    elif method == "selector":
+        result = signature(result)
+    return result, parser.i
+
+
+def broken(css: str, rng: random.Random) -> str:
+    chars = list(css)
+    for _ in range(rng.randint(1, 20)):
+        i = rng.randrange(len(chars) + 1)
+        if rng.random() < 0.5 and i < len(chars):
+            del chars[i]
+        else:
+            chars.insert(i, rng.choice(NOISE))
+    return "".join(chars)
+
+
+def test_parse() -> None:
+    assert parsed("p { color: red; } DIV p{FONT-size:90%;font-weight:bold;}\n\nA{}") == [
+        (("p",), {"color": "red"}),
+        (("div", "p"), {"font-size": "90%", "font-weight": "bold"}),
+        (("a",), {}),
+    ]
+    # values keep their case, words can be any letters or digits
+    assert parsed("Straße ǅx { Color:\tRed ;　x: ½Ⅷ٣; }") == [
+        (("strasse", "ǆx"), {"color": "Red", "x": "½Ⅷ٣"})]
+
+
+def test_broken_css_is_skipped() -> None:
+    # a broken declaration up to the next ;
+    assert parsed("p { color red; font-weight: bold; }") == [(("p",), {"font-weight": "bold"})]
+    # a declaration that only breaks after its value keeps the value
+    assert parsed("p { color: re_d; font-weight: bold }") == [(("p",), {"color": "re", "font-weight": "bold"})]
+    assert parsed("p { color: red; x }") == [(("p",), {"color": "red"})]
+    # a broken rule up to the next }
+    assert parsed("p { color: red; } a > b { color: blue; } i { color: green; }") == [
+        (("p",), {"color": "red"}), (("i",), {"color": "green"})]
+    assert parsed("p_x { color: red; } i { color: green; }") == [(("i",), {"color": "green"})]
+    assert parsed("@media print { p { color: red; } } i { color: green; }") == [
+        (("i",), {"color": "green"})]
+    # unfinished at the end
+    assert parsed("i { color: green; } p { color: red") == [(("i",), {"color": "green"})]
+    assert parsed("i { color: green; } p") == [(("i",), {"color": "green"})]
+    assert parsed("") == parsed(" \n ") == parsed("}") == []
+
+
+def test_any_text_parses() -> None:
+    rng = random.Random(0)
+    for n in range(300):
+        chars = list(stylesheet(rng.randint(1, 10), seed=n))
+        for _ in range(rng.randint(1, 20)):
+            chars.insert(rng.randrange(len(chars) + 1), rng.choice(NOISE))
+        parser = CSSParser("".join(chars))
+        for selector, body in parser.parse():
+            assert all(isinstance(value, str) for value in body.values())
+        assert parser.i == len(parser.s)
+
+
+def test_selector_and_inline_style() -> None:
+    assert signature(CSSParser("div  UL\tli {").selector()) == ("div", "ul", "li")
+    assert signature(CSSParser("b").selector()) == ("b",)
+    for text in ["{", "", "_a {", "a > b {"]:
+        try:
+            CSSParser(text).selector()
+        except Exception:
+            continue
+        raise AssertionError(text)
+    assert CSSParser("color: red; bogus; font-size: 90%").body() == {"color": "red", "font-size": "90%"}
+    assert CSSParser("color: red } font-size: 90%").body() == {"color": "red"}
+
+
+def test_same_results_as_the_character_parser() -> None:
+    rng = random.Random(0)
+    for n in range(2000):
+        css = stylesheet(rng.randint(1, 20), seed=n)
+        if n % 4:
+            css = broken(css, rng)
+        inline = broken("color: red; font-weight: bold; font-size: 90%", rng)
+        for text, method in [(css, "parse"), (inline, "body"), (css[:rng.randint(0, 40)], "selector")]:
+            assert outcome(CSSParser(text), method) == outcome(CharacterParser(text), method), (method, text)
+
+
+def test_character_classes() -> None:
+    # what the regular expressions rely on, for every code point
+    word = re.compile(r"[^\W_]")
+    space = re.compile(r"\s")
+    for code in range(sys.maxunicode + 1):
+        char = chr(code)
+        assert (word.fullmatch(char) is not None) == char.isalnum(), hex(code)
+        assert (space.fullmatch(char) is not None) == char.isspace(), hex(code)
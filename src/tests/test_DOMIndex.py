@@ -0,0 +1,54 @@
+import random
+
+from src.benchmarks.Documents import forms_document
+from src.dom.DOMIndex import DOMIndex
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Traversal import elements
+
+TAGS = ["html", "body", "form", "p", "input", "button", "b", "i", "div", "strong"]
+FRAGMENTS = ["<p>plain <b>text</b></p>", "<form><input name=a><input name=b><button>go</button></form>",
+             "", "text only", "<strong>warning</strong> <div><p>x <b>y</b></p></div>"]
+
+
+# what innerHTML does to the document
+def replace_children(index: DOMIndex, elt, html: str) -> None:
+    old_children = elt.children
+    elt.children = HTMLParser("<html><body>" + html + "</body></html>").parse().children[0].children
+    for child in elt.children:
+        child.parent = elt
+    index.replace_children(elt, old_children)
+
+
+def check(index: DOMIndex) -> None:
+    assert len(index) == sum(1 for node in elements(index.root))
+    for tag in TAGS:
+        assert list(index.get(tag)) == list(elements(index.root, tag)), tag
+
+
+def test_index_follows_replaced_children() -> None:
+    rng = random.Random(0)
+    root = HTMLParser(forms_document(30)).parse()
+    index = DOMIndex(root)
+    check(index)
+    for _ in range(300):
+        target = rng.choice(list(elements(root, "form", "p", "div", "strong", "b")))
+        replace_children(index, target, rng.choice(FRAGMENTS))
+        check(index)
+
+
+def test_many_replacements_at_one_place() -> None:
+    # the gaps between the orders run out and the index has to be rebuilt
+    root = HTMLParser("<div><p>a</p><p>b</p></div><p>c</p>").parse()
+    index = DOMIndex(root)
+    target = root.children[0].children[0].children[0]
+    replace_children(index, target, "<b>new</b>")
+    # indexed in the gap before the next p, the rest of the document keeps its orders
+    assert index.orders[target.children[0]] % 1 and index.orders[target.parent.children[1]] == 4
+    for i in range(100):
+        replace_children(index, target, "<b>{}</b><i>x</i>".format(i))
+        check(index)
+    # elements that are not in the document any more are ignored
+    detached = target.children[0]
+    replace_children(index, target, "")
+    replace_children(index, detached, "<p>gone</p>")
+    check(index)
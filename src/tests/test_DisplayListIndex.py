@@ -0,0 +1,55 @@
+import random
+
+from src.drawing.DisplayListIndex import DisplayListIndex
+from src.drawing.DrawRect import DrawRect
+from src.layout.Rect import Rect
+
+TALL = 100
+
+
+def command(rng: random.Random) -> DrawRect:
+    top = rng.uniform(0, 5000)
+    height = rng.choice([0, 5, 20, TALL, TALL + 1, 3000]) if rng.random() < 0.2 else rng.uniform(0, 30)
+    return DrawRect(Rect(0, top, 10, top + height), "red")
+
+
+# every command that reaches into top..bottom, in paint order
+def overlapping(display_list: list, top: float, bottom: float) -> list:
+    return [cmd for cmd in display_list if cmd.rect.top <= bottom and cmd.rect.bottom >= top]
+
+
+def check(index: DisplayListIndex, display_list: list, rng: random.Random) -> None:
+    assert len(index) == len(display_list)
+    for _ in range(20):
+        top = rng.uniform(-200, 5200)
+        bottom = top + rng.choice([0, 10, 600])
+        assert index.visible(top, bottom) == overlapping(display_list, top, bottom)
+
+
+def test_visible_after_updates() -> None:
+    rng = random.Random(0)
+    display_list = [command(rng) for _ in range(500)]
+    index = DisplayListIndex(TALL)
+    index.update(display_list)
+    check(index, display_list, rng)
+    for _ in range(300):
+        display_list = list(display_list)
+        start = rng.randint(0, len(display_list))
+        end = min(len(display_list), start + rng.choice([0, 1, 1, 3, 40]))
+        display_list[start:end] = [command(rng) for _ in range(rng.choice([0, 1, 1, 2, 40]))]
+        index.update(display_list)
+        check(index, display_list, rng)
+
+
+def test_many_inserts_at_one_place() -> None:
+    # the gaps between the orders run out and the index has to be rebuilt
+    rng = random.Random(1)
+    display_list = [command(rng) for _ in range(50)]
+    index = DisplayListIndex(TALL)
+    index.update(display_list)
+    for _ in range(200):
+        display_list = display_list[:25] + [command(rng)] + display_list[25:]
+        index.update(display_list)
+        check(index, display_list, rng)
+    index.update([])
+    assert index.visible(0, 5000) == []
@@ -0,0 +1,72 @@
+import socket
+import threading
+import time
+
+from Fetcher import Fetcher
+from Tab import Tab
+from URL import URL
+
+SCRIPTS = 6
+
+
+class SlowServer:
+    # answers every request on its own connection after a delay per path,
+    # and records how many requests were in flight at once
+    def __init__(self, delays: dict[str, float], bodies: dict[str, str]) -> None:
+        self.delays = delays
+        self.bodies = bodies
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        self.server = socket.socket()
+        self.server.bind(("127.0.0.1", 0))
+        self.server.listen(32)
+        self.port = self.server.getsockname()[1]
+        threading.Thread(target=self.accept, daemon=True).start()
+
+    def accept(self) -> None:
+        while True:
+            conn, _ = self.server.accept()
+            threading.Thread(target=self.handle, args=(conn,), daemon=True).start()
+
+    def handle(self, conn: socket.socket) -> None:
+        file = conn.makefile("rb")
+        path = file.readline().decode("utf8").split(" ")[1]
+        while file.readline() not in (b"\r\n", b""):
+            pass
+        with self.lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(self.delays.get(path, 0))
+        with self.lock:
+            self.in_flight -= 1
+        body = self.bodies.get(path, "").encode("utf8")
+        conn.sendall(b"HTTP/1.1 200 OK\r\nConnection: close\r\nContent-Length: "
+                     + str(len(body)).encode() + b"\r\n\r\n" + body)
+        file.close()
+        conn.close()
+
+    def url(self, path: str) -> URL:
+        return URL("http://127.0.0.1:{}{}".format(self.port, path))
+
+
+def test_scripts_run_in_document_order() -> None:
+    # the first script arrives last
+    paths = ["/{}.js".format(i) for i in range(SCRIPTS)]
+    bodies = {path: "if (typeof order == 'undefined') order = []; order.push({});".format(i)
+              for i, path in enumerate(paths)}
+    bodies["/"] = "".join("<script src={}></script>".format(path) for path in paths) + "<p>page</p>"
+    server = SlowServer({path: 0.05 * (SCRIPTS - i) for i, path in enumerate(paths)}, bodies)
+    tab = Tab(600)
+    tab.load(server.url("/"))
+    assert tab.js.run("test", "order") == list(range(SCRIPTS))
+    assert server.max_in_flight > 1  # downloaded in parallel
+
+
+def test_in_flight_requests_per_origin_are_capped() -> None:
+    server = SlowServer({"/{}".format(i): 0.05 for i in range(8)}, {})
+    fetcher = Fetcher(max_per_origin=2)
+    downloads = [fetcher.fetch(server.url("/{}".format(i)), None) for i in range(8)]
+    for download in downloads:
+        download.result()
+    assert server.max_in_flight == 2
@@ -0,0 +1,134 @@
+import random
+
+from src.benchmarks.Documents import deep_document, forms_document, prose_document, tree_signature, wide_document
+from src.dom.HTMLParser import HTMLParser
+
+
+class ListHTMLParser(HTMLParser):
+    # implicit_tags before it stopped looking at deeply nested documents
+    def implicit_tags(self, tag: str | None) -> None:
+        while True:
+            open_tags = [node.tag for node in self.unfinished]
+            if open_tags == [] and tag != "html":
+                self.add_tag("html")
+            elif (open_tags == ["html"] and
+                  tag not in ["head", "body", "/html"]):
+                if tag in self.HEAD_TAGS:
+                    self.add_tag("head")
+                else:
+                    self.add_tag("body")
+            elif (open_tags == ["html", "head"] and
+                  tag not in ["/head"] + self.HEAD_TAGS):
+                self.add_tag("/head")
+            else:
+                break
+
+
+# small documents around the <html>/<head>/<body> boundaries, where implicit tags matter
+def fragment(rng: random.Random) -> str:
+    pieces = ["<html>", "</html>", "<head>", "</head>", "<body>", "</body>", "<title>", "</title>",
+              "<meta>", "<link rel=stylesheet>", "<script>", "</script>", "<div>", "</div>",
+              "<p>", "</p>", "<br>", "<!doctype html>", "text", " ", "<b>", "</b>"]
+    return "".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+
+
+def outcome(parser: type[HTMLParser], body: str):
+    try:
+        return tree_signature(parser(body).parse())
+    except Exception as e:  # both versions have to fail the same way too
+        return type(e).__name__
+
+
+def parse_in_chunks(body: str, splits: list[int]):
+    parser = HTMLParser()
+    start = 0
+    for split in sorted(splits) + [len(body)]:
+        parser.feed(body[start:split])
+        start = split
+    return parser.close()
+
+
+def test_tree() -> None:
+    root = HTMLParser('<p class="a">hello <b>world</b><br>done</p>').parse()
+    assert tree_signature(root) == [
+        ("html", [], None, 1),
+        ("body", [], "html", 1),
+        ("p", [("class", "a")], "body", 4),
+        ("text", "hello ", "p"),
+        ("b", [], "p", 1),
+        ("text", "world", "b"),
+        ("br", [], "p", 0),
+        ("text", "done", "p"),
+    ]
+
+
+def test_attributes() -> None:
+    root = HTMLParser("<input NAME=q value='xy' disabled>").parse()
+    node = root.children[0].children[0]
+    assert node.attributes == {"name": "q", "value": "xy", "disabled": ""}
+
+
+def test_comments_and_unfinished_tags() -> None:
+    root = HTMLParser("<!doctype html><!-- note --><p>a<p>b").parse()
+    assert tree_signature(root) == [
+        ("html", [], None, 1),
+        ("body", [], "html", 1),
+        ("p", [], "body", 2),
+        ("text", "a", "p"),
+        ("p", [], "p", 1),
+        ("text", "b", "p"),
+    ]
+    # text after an unfinished < is dropped
+    assert tree_signature(HTMLParser("<p>a</p><di").parse()) == tree_signature(HTMLParser("<p>a</p>").parse())
+
+
+def test_chunks_split_anywhere() -> None:
+    rng = random.Random(0)
+    for body in [prose_document(20 * 1024), forms_document(20), "<p>a<b>b</b>c</p>", "x<", "<p"]:
+        expected = tree_signature(HTMLParser(body).parse())
+        for _ in range(20):
+            splits = [rng.randint(0, len(body)) for _ in range(rng.randint(1, 30))]
+            assert tree_signature(parse_in_chunks(body, splits)) == expected
+        # one character at a time, so every tag is split
+        assert tree_signature(parse_in_chunks(body[:2000], list(range(2000)))) == \
+            tree_signature(HTMLParser(body[:2000]).parse())
+
+
+def test_implicit_tags() -> None:
+    cases = {
+        "": [("html", [], None, 1), ("body", [], "html", 0)],
+        "text": [("html", [], None, 1), ("body", [], "html", 1), ("text", "text", "body")],
+        "<title>t</title><p>x": [
+            ("html", [], None, 2), ("head", [], "html", 1), ("title", [], "head", 1), ("text", "t", "title"),
+            ("body", [], "html", 1), ("p", [], "body", 1), ("text", "x", "p")],
+        "<link rel=stylesheet href=a.css><script>s</script>text": [
+            ("html", [], None, 2), ("head", [], "html", 2),
+            ("link", [("href", "a.css"), ("rel", "stylesheet")], "head", 0),
+            ("script", [], "head", 1), ("text", "s", "script"),
+            ("body", [], "html", 1), ("text", "text", "body")],
+    }
+    for body, expected in cases.items():
+        assert tree_signature(HTMLParser(body).parse()) == expected, body
+    # written out, the same document needs no implicit tags
+    assert tree_signature(HTMLParser("<html><head><title>t</title></head><body><p>x</p></body></html>").parse()) \
+        == cases["<title>t</title><p>x"]
+
+
+def test_no_implicit_tags_deeper_in_the_document() -> None:
+    root = HTMLParser("<html><body><div><html><head>y</div>").parse()
+    assert tree_signature(root) == [
+        ("html", [], None, 1), ("body", [], "html", 1), ("div", [], "body", 1),
+        ("html", [], "div", 1), ("head", [], "html", 1), ("text", "y", "head")]
+    signature = tree_signature(HTMLParser(deep_document(5000)).parse())
+    assert [entry[0] for entry in signature[:3]] == ["html", "body", "div"]
+    assert sum(1 for entry in signature if entry[0] in ["html", "head", "body"]) == 2
+
+
+def test_implicit_tags_match_the_previous_version() -> None:
+    rng = random.Random(0)
+    for _ in range(5000):
+        body = fragment(rng)
+        assert outcome(HTMLParser, body) == outcome(ListHTMLParser, body), body
+    for body in [deep_document(1000), deep_document(3000), wide_document(1000), wide_document(20000),
+                 "<title>t</title>" + deep_document(500), "text" + wide_document(500)]:
+        assert outcome(HTMLParser, body) == outcome(ListHTMLParser, body), body[:80]
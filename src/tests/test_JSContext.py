@@ -0,0 +1,84 @@
+import random
+
+from Tab import Tab
+from URL import URL
+from src.benchmarks.Documents import forms_document
+from src.dom.Traversal import elements, pre_order
+from src.styling.CSSParser import CSSParser
+
+SELECTORS = ["input", "form", "button", "form input", "body form button", "p", "strong", "div p b"]
+FRAGMENTS = ["<p>plain <b>text</b></p>", "<form><input name=a><input name=b><button>go</button></form>",
+             "", "<strong>warning</strong> <div><p>x <b>y</b></p></div>"]
+
+
+def load(tmp_path, html: str) -> Tab:
+    path = tmp_path / "page.html"
+    path.write_text(html)
+    tab = Tab(600)
+    tab.load(URL("file://{}".format(path)))
+    return tab
+
+
+def test_query_selector_all_after_inner_html(tmp_path) -> None:
+    rng = random.Random(0)
+    tab = load(tmp_path, forms_document(30))
+    for i in range(200):
+        if i % 4 == 0:
+            target = rng.choice(list(elements(tab.nodes, "form", "p", "div", "strong")))
+            tab.js.innerHTML_set(tab.js.get_handle(target), rng.choice(FRAGMENTS))
+        selector_text = rng.choice(SELECTORS)
+        selector = CSSParser(selector_text).selector()
+        expected = [node for node in pre_order(tab.nodes) if selector.matches(node)]
+        found = [tab.js.handle_to_node[handle] for handle in tab.js.querySelectorAll(selector_text)]
+        assert found == expected, selector_text
+
+
+REWRITE = """
+var container = document.querySelectorAll("div")[0];
+var html = "";
+for (var i = 0; i < 5; i++) html += "<p><button>item " + i + "</button></p>";
+for (var round = 0; round < 20; round++) {
+    container.innerHTML = html;
+    var buttons = document.querySelectorAll("button");
+    for (var j = 0; j < buttons.length; j++) {
+        buttons[j].addEventListener("click", function (e) { e.preventDefault(); });
+    }
+}
+"""
+
+
+def listeners(tab: Tab) -> list[int]:
+    return sorted(int(handle) for handle in tab.js.run("test", "Object.keys(LISTENERS)"))
+
+
+def test_detached_nodes_release_their_handles(tmp_path) -> None:
+    tab = load(tmp_path, "<div><p>start</p></div><p>footer</p>")
+    tab.js.run("test", REWRITE)
+    buttons = list(elements(tab.nodes, "button"))
+    assert len(buttons) == 5
+    # the container and the buttons of the last round
+    assert tab.js.live_handles() == 6
+    assert listeners(tab) == sorted(tab.js.node_to_handle[button] for button in buttons)
+    # the listeners of nodes in the document still run
+    assert all(tab.js.dispatch_event("click", button) for button in buttons)
+
+    handle = tab.js.node_to_handle[buttons[0]]
+    tab.js.run("test", 'document.querySelectorAll("div")[0].innerHTML = "<b>empty</b>"')
+    assert tab.js.live_handles() == 1 and listeners(tab) == []
+    assert buttons[0] not in tab.js.node_to_handle and handle not in tab.js.handle_to_node
+    assert not tab.js.dispatch_event("click", buttons[0])  # a detached node has no handle
+
+
+def test_stale_handles(tmp_path) -> None:
+    tab = load(tmp_path, "<div><p id=x>start</p></div><p>footer</p>")
+    released = tab.js.run("test", """
+        var old = document.querySelectorAll("div p")[0];
+        document.querySelectorAll("div")[0].innerHTML = "<p id=y>new</p>";
+        old.innerHTML = "<b>lost</b>";  // the node isn't in the document any more
+        [old.handle, old.getAttribute("id"), document.querySelectorAll("div p")[0].getAttribute("id"),
+         document.querySelectorAll("div p")[0].handle]
+    """)
+    old, attribute, new_attribute, new = released
+    assert attribute == "" and new_attribute == "y"
+    assert new > old  # handles are never reused
+    assert [node.tag for node in elements(tab.nodes, "b")] == []
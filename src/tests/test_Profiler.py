@@ -0,0 +1,32 @@
+import threading
+
+from src.user_agent.Profiler import Profiler
+
+THREADS = 8
+ROUNDS = 2000
+
+
+def test_phases_and_counters_from_threads() -> None:
+    profiler = Profiler()
+    profiler.enable(trace=True)
+    start = threading.Barrier(THREADS)
+
+    def work() -> None:
+        start.wait()
+        for _ in range(ROUNDS):
+            with profiler.phase("outer"):
+                with profiler.phase("inner"):
+                    profiler.count("items")
+                profiler.count("items", 2)
+
+    threads = [threading.Thread(target=work) for _ in range(THREADS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert profiler.counters["items"] == THREADS * ROUNDS * 3
+    assert profiler.phases["outer"][0] == profiler.phases["inner"][0] == THREADS * ROUNDS
+    # one counters event per outermost phase, the nesting of other threads doesn't count
+    assert sum(1 for event in profiler.events if event["ph"] == "C") == THREADS * ROUNDS
+    assert profiler.depth() == 0
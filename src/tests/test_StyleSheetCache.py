@@ -0,0 +1,63 @@
+from Tab import Tab
+from URL import URL
+from src.benchmarks.Documents import prose_document, stylesheet
+from src.styling import CSSParser
+from src.styling.StyleSheetCache import STYLE_SHEET_CACHE, StyleSheetCache
+
+INLINE_STYLES = ["color:blue", "font-weight:bold;color:gray", "font-size:110%"]
+
+
+def test_sheets_and_cascades_are_shared() -> None:
+    cache = StyleSheetCache(max_sheets=2, max_cascades=2)
+    a, b, c = (cache.parse(stylesheet(20, seed)) for seed in range(3))
+    assert cache.parse(stylesheet(20, 2)) is c
+    assert cache.parse(stylesheet(20, 0)) is not a  # evicted, the least recently used
+    assert (cache.hits, cache.misses) == (1, 4)
+
+    assert cache.cascade([b, c]) is cache.cascade([b, c])
+    assert cache.cascade([c, b]) is not cache.cascade([b, c])
+    assert cache.cascade([b, c]).rules == sorted(b.rules + c.rules, key=CSSParser.cascade_priority)
+
+
+def styles(root) -> list:
+    out = []
+    stack = [root]
+    while stack:
+        node = stack.pop()
+        out.append(dict(node.style))
+        stack.extend(node.children)
+    return out
+
+
+def load_all(paths: list) -> list:
+    results = []
+    for path in paths:
+        tab = Tab(600, scripts=False)
+        tab.load(URL("file://{}".format(path)))
+        results.append(styles(tab.nodes))
+    return results
+
+
+def test_caches_keep_the_computed_styles(tmp_path, monkeypatch) -> None:
+    for seed, name in enumerate(["a.css", "b.css"]):
+        (tmp_path / name).write_text(stylesheet(200, seed))
+    paths = []
+    for page in range(4):
+        links = "<link rel=stylesheet href=a.css>" + ("<link rel=stylesheet href=b.css>" if page % 2 else "")
+        parts = prose_document(8 * 1024, seed=page).replace("</head>", links + "</head>").split("<p>")
+        html = parts[0] + "".join("<p style={}>".format(INLINE_STYLES[i % len(INLINE_STYLES)]) + part
+                                  for i, part in enumerate(parts[1:]))
+        paths.append(tmp_path / "page{}.html".format(page))
+        paths[-1].write_text(html)
+
+    with monkeypatch.context() as patch:
+        patch.setattr(STYLE_SHEET_CACHE, "max_sheets", 0)
+        patch.setattr(STYLE_SHEET_CACHE, "max_cascades", 0)
+        patch.setattr(CSSParser, "INLINE_STYLE_CACHE_SIZE", 0)
+        STYLE_SHEET_CACHE.clear()
+        CSSParser.INLINE_STYLES.clear()
+        expected = load_all(paths)
+    assert any(style["color"] == "blue" for style in expected[0])  # the style attributes apply
+    STYLE_SHEET_CACHE.clear()
+    assert load_all(paths + paths) == expected + expected
+    assert STYLE_SHEET_CACHE.hits > 0
@@ -0,0 +1,172 @@
+import random
+
+from Tab import Tab
+from URL import URL
+from src.benchmarks.Documents import forms_document, prose_document, stylesheet
+from src.dom.Text import Text
+from src.drawing.RecordingCanvas import RecordingCanvas
+from src.layout.InputLayout import InputLayout
+from src.layout.TextLayout import TextLayout
+from src.styling.CSSParser import style
+
+FRAGMENTS = ["", "plain text", "<b>bold</b> and <i>italic</i>", "<p>a new <span>paragraph</span></p>",
+             "<div><p>nested</p><p>blocks</p></div>", "<big>big <small>small</small></big>"]
+STYLES = ["font-size:150%", "font-size:12px", "font-weight:bold", "font-style:italic",
+          "background-color:yellow", "color:red"]
+
+
+def find(tab: Tab, matches):
+    stack = [tab.document]
+    while stack:
+        layout_object = stack.pop()
+        if matches(layout_object):
+            return layout_object
+        stack.extend(layout_object.children)
+    raise LookupError()
+
+
+def click_on(tab: Tab, layout_object) -> None:
+    tab.click(layout_object.x + 1, layout_object.y + 1 - tab.scroll)
+
+
+def click_word(tab: Tab, word: str) -> None:
+    click_on(tab, find(tab, lambda layout_object: isinstance(layout_object, TextLayout)
+                       and layout_object.word == word))
+
+
+def click_tag(tab: Tab, tag: str) -> None:
+    click_on(tab, find(tab, lambda layout_object: isinstance(layout_object, InputLayout)
+                       and layout_object.node.tag == tag))
+
+
+def subtree(node) -> list:
+    out = []
+    stack = [node]
+    while stack:
+        node = stack.pop()
+        out.append(node)
+        stack.extend(reversed(node.children))
+    return out
+
+
+def page_text(tab: Tab) -> str:
+    words = []
+    stack = [tab.nodes]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, Text):
+            words.append(node.text)
+        stack.extend(reversed(node.children))
+    return " ".join(words)
+
+
+def test_links_and_forms_without_scripts(tmp_path, monkeypatch) -> None:
+    (tmp_path / "next.html").write_text("<p>second page</p>")
+    (tmp_path / "sent.html").write_text("<p>form sent</p>")
+    (tmp_path / "index.html").write_text(
+        "<script>var broken =</script><p><a href=next.html>onward</a></p>"
+        "<form action=sent.html><p><input name=q value=old></p><p><button>send</button></p></form>")
+    tab = Tab(600, scripts=False)
+    tab.load(URL("file://{}".format(tmp_path / "index.html")))
+    assert tab.js is None
+
+    click_word(tab, "onward")
+    assert str(tab.url).endswith("next.html")
+    assert page_text(tab) == "second page"
+
+    tab.go_back()
+    click_tag(tab, "input")
+    assert tab.focus.tag == "input"
+    for char in "new":
+        tab.keypress(char)
+
+    payloads = []
+    load = tab.load
+    monkeypatch.setattr(tab, "load", lambda url, payload=None: payloads.append(payload) or load(url, payload))
+    click_tag(tab, "button")
+    assert payloads == ["q=new"]
+    assert str(tab.url).endswith("sent.html")
+    assert page_text(tab) == "form sent"
+
+
+# what a canvas cleared before every frame shows: the visible commands in paint order
+def redrawn(tab: Tab, offset: int) -> list[dict]:
+    canvas = RecordingCanvas()
+    for cmd in tab.display_list:
+        if cmd.rect.top <= tab.scroll + tab.tab_height and cmd.rect.bottom >= tab.scroll:
+            cmd.execute(tab.scroll - offset, canvas)
+    return canvas.items
+
+
+def test_retained_draw_shows_what_a_redraw_would(tmp_path) -> None:
+    rng = random.Random(0)
+    (tmp_path / "page.html").write_text(
+        prose_document(40 * 1024).replace("</body>", "<p><input name=x value=abc></p></body>"))
+    tab = Tab(500, scripts=False)
+    tab.load(URL("file://{}".format(tmp_path / "page.html")))
+    field = find(tab, lambda layout_object: isinstance(layout_object, InputLayout)).node
+    canvas = RecordingCanvas()
+    offset = 60
+    for step in range(200):
+        choice = rng.random()
+        if choice < 0.4:
+            tab.scrolldown()
+        elif choice < 0.6:
+            tab.scroll = max(tab.scroll - 100, 0)
+        elif choice < 0.7:
+            tab.scroll = rng.randrange(int(tab.document.height))
+        elif choice < 0.8:
+            field.attributes["value"] += "q"
+            field.is_focused = not field.is_focused
+            tab.render()
+        elif choice < 0.85:  # another tab was drawn in between
+            canvas = RecordingCanvas()
+            tab.forget_canvas()
+        tab.draw(canvas, offset)
+        assert canvas.items == redrawn(tab, offset), step
+
+
+def test_dirty_restyle_matches_a_full_restyle(tmp_path) -> None:
+    rng = random.Random(0)
+    (tmp_path / "page.css").write_text(stylesheet(80))
+    (tmp_path / "page.html").write_text(
+        "<link rel=stylesheet href=page.css>" + prose_document(8 * 1024).replace("</body>", forms_document(3)[12:]))
+    tab = Tab(600)
+    tab.load(URL("file://{}".format(tmp_path / "page.html")))
+
+    for step in range(80):
+        candidates = [node for node in subtree(tab.nodes) if hasattr(node, "tag") and node.tag != "html"]
+        node = rng.choice(candidates)
+        if rng.random() < 0.5:
+            node.attributes["style"] = rng.choice(STYLES)
+            node.mark_style_dirty()
+            tab.render()
+            assert tab.restyled_nodes <= len(subtree(node)), step  # nothing outside the changed subtree
+        else:
+            tab.js.innerHTML_set(tab.js.get_handle(node), rng.choice(FRAGMENTS))  # renders
+            assert tab.restyled_nodes == len(subtree(node)) - 1, step  # only the new children
+
+        styles = [node.style for node in subtree(tab.nodes)]
+        style(tab.nodes, tab.rule_index, force=True)
+        assert [node.style for node in subtree(tab.nodes)] == styles, step
+
+
+def test_only_dirty_subtrees_are_restyled(tmp_path) -> None:
+    (tmp_path / "page.html").write_text("<div><p>one <b>two</b></p><p>three</p></div><p>four</p>")
+    tab = Tab(600)
+    tab.load(URL("file://{}".format(tmp_path / "page.html")))
+    assert tab.restyled_nodes == len(subtree(tab.nodes))
+    div = next(node for node in subtree(tab.nodes) if getattr(node, "tag", None) == "div")
+
+    tab.render()
+    assert tab.restyled_nodes == 0
+    div.attributes["style"] = "background-color:yellow"  # not inherited, so the grandchildren are skipped
+    div.mark_style_dirty()
+    tab.render()
+    assert tab.restyled_nodes == 3  # the div and its two paragraphs
+    div.attributes["style"] = "font-size:150%"  # inherited by the whole subtree
+    div.mark_style_dirty()
+    tab.render()
+    assert tab.restyled_nodes == len(subtree(div)) == 7
+    tab.js.innerHTML_set(tab.js.get_handle(div), "<b>x</b> y")
+    assert tab.restyled_nodes == 3
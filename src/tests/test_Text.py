@@ -0,0 +1,19 @@
+from src.dom.Element import Element
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Text import Text
+
+
+def test_nodes_have_no_dict() -> None:
+    root = HTMLParser("<p>text</p>").parse()
+    text = root.children[0].children[0].children[0]
+    assert isinstance(text, Text)
+    assert not hasattr(root, "__dict__") and not hasattr(text, "__dict__")
+
+
+def test_focus_can_be_set_on_text() -> None:
+    parent = Element("p", {}, None)
+    text = Text("word", parent)
+    assert not text.is_focused
+    text.is_focused = True
+    assert text.is_focused
+    assert not Text("other", parent).is_focused  # not shared between nodes
@@ -0,0 +1,42 @@
+import sys
+
+from src.benchmarks.Documents import deep_document
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Text import Text
+from src.dom.Traversal import elements, of_type, post_order, pre_order, with_depth
+from src.layout.DocumentLayout import DocumentLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.RuleIndex import RuleIndex
+from src.user_agent.Utils import paint_tree
+
+
+def names(nodes) -> list[str]:
+    return [node.text if isinstance(node, Text) else node.tag for node in nodes]
+
+
+def test_walk_orders() -> None:
+    root = HTMLParser("<div><p>a</p><p>b<i>c</i></p></div><b>d</b>").parse()
+    assert names(pre_order(root)) == ["html", "body", "div", "p", "a", "p", "b", "i", "c", "b", "d"]
+    assert names(post_order(root)) == ["a", "p", "b", "c", "i", "p", "div", "d", "b", "body", "html"]
+    assert [(depth, names([node])[0]) for depth, node in with_depth(root)] == [
+        (0, "html"), (1, "body"), (2, "div"), (3, "p"), (4, "a"), (3, "p"), (4, "b"), (4, "i"), (5, "c"),
+        (2, "b"), (3, "d")]
+    assert names(pre_order(root, descend=lambda node: node.tag != "p")) == \
+        ["html", "body", "div", "p", "p", "b", "d"]
+    assert names(of_type(root, Text)) == ["a", "b", "c", "d"]
+    assert names(elements(root, "b", "i")) == ["i", "b"]
+    assert len(list(elements(root))) == 7
+
+
+def test_deep_documents() -> None:
+    rules = RuleIndex(sorted(CSSParser(open("user_agent/browser.css").read()).parse(), key=cascade_priority))
+    depth = 20 * sys.getrecursionlimit()
+    for tags in (["div"], ["div", "span", "b", "p"]):  # nested blocks and nested inline content
+        root = HTMLParser(deep_document(depth, tags=tags)).parse()
+        assert max(level for level, node in with_depth(root)) == depth + 2  # html, body and the text
+        assert style(root, rules, force=True) == sum(1 for node in pre_order(root))
+        document = DocumentLayout(root)
+        document.layout()
+        display_list = []
+        paint_tree(document, display_list)
+        assert sum(1 for cmd in display_list if hasattr(cmd, "text")) == 2 * depth  # two words per level
@@ -0,0 +1,212 @@
+import gzip
+import socket
+import threading
+import zlib
+
+import pytest
+
+from ConnectionPool import CONNECTION_POOL
+from HTTPCache import HTTP_CACHE, HTTPCache
+from URL import URL
+
+
+# answers the requests on each accepted connection with its raw responses in turn,
+# then closes that connection and waits for the next one. Records the request heads
+def serve_connections(connections: list[list[bytes]]) -> tuple[int, list[str]]:
+    server = socket.socket()
+    server.bind(("127.0.0.1", 0))
+    server.listen()
+    requests = []
+
+    def run() -> None:
+        for responses in connections:
+            conn, _ = server.accept()
+            file = conn.makefile("rb")
+            for response in responses:
+                request = file.readline().decode("utf8")
+                while (line := file.readline()) not in (b"\r\n", b""):
+                    request += line.decode("utf8")
+                if "Content-Length" in request:
+                    file.read(int(request.split("Content-Length: ")[1].split("\r\n")[0]))
+                requests.append(request)
+                conn.sendall(response)
+            file.close()
+            conn.close()
+        server.close()
+
+    threading.Thread(target=run, daemon=True).start()
+    return server.getsockname()[1], requests
+
+
+def request_lines(requests: list[str]) -> list[str]:
+    return [request.split("\r\n")[0] for request in requests]
+
+
+# one keep-alive connection
+def serve(responses: list[bytes]) -> tuple[int, list[str]]:
+    return serve_connections([responses])
+
+
+def test_interim_responses_are_skipped() -> None:
+    port, requests = serve([
+        b"HTTP/1.1 100 Continue\r\n\r\n"
+        b"HTTP/1.1 103 Early Hints\r\nLink: </style.css>\r\n\r\n"
+        b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nfirst",
+        b"HTTP/1.1 200 OK\r\nContent-Length: 6\r\n\r\nsecond",
+    ])
+    headers, body = URL("http://127.0.0.1:{}/one".format(port)).request(None)
+    assert body == "first"
+    assert "link" not in headers
+    # the connection went back to the pool in sync and is used for the next request
+    headers, body = URL("http://127.0.0.1:{}/two".format(port)).request(None)
+    assert body == "second"
+    assert request_lines(requests) == ["GET /one HTTP/1.1", "GET /two HTTP/1.1"]
+
+
+def test_closed_idle_connection_is_retried() -> None:
+    port, requests = serve_connections([
+        [b"HTTP/1.1 200 OK\r\nContent-Length: 5\r\n\r\nfirst"],  # closed after the first response
+        [b"HTTP/1.1 200 OK\r\nContent-Length: 6\r\n\r\nsecond"],
+    ])
+    assert URL("http://127.0.0.1:{}/one".format(port)).request(None)[1] == "first"
+    assert URL("http://127.0.0.1:{}/two".format(port)).request(None)[1] == "second"
+    assert request_lines(requests) == ["GET /one HTTP/1.1", "GET /two HTTP/1.1"]
+
+
+def test_new_connection_without_a_response() -> None:
+    port, requests = serve_connections([[]])  # closes right away
+    with pytest.raises(OSError):
+        URL("http://127.0.0.1:{}/".format(port)).request(None)
+
+
+def response(body: str, *headers: str, status: str = "200 OK") -> bytes:
+    head = "".join(header + "\r\n" for header in headers)
+    return "HTTP/1.1 {}\r\n{}Content-Length: {}\r\n\r\n{}".format(
+        status, head, len(body.encode("utf8")), body).encode("utf8")
+
+
+def test_fresh_responses_come_from_the_cache() -> None:
+    port, requests = serve([response("cached", "Cache-Control: max-age=60"),
+                            response("no-store", "Cache-Control: no-store, max-age=60"),
+                            response("no-store again")])
+    url = "http://127.0.0.1:{}/".format(port)
+    assert URL(url + "a.css").request(None)[1] == "cached"
+    assert URL(url + "a.css").request(None)[1] == "cached"
+    assert URL(url + "b.css").request(None)[1] == "no-store"
+    assert URL(url + "b.css").request(None)[1] == "no-store again"
+    assert request_lines(requests) == ["GET /a.css HTTP/1.1", "GET /b.css HTTP/1.1", "GET /b.css HTTP/1.1"]
+
+
+def test_stale_responses_are_revalidated() -> None:
+    port, requests = serve([
+        response("body", "ETag: \"v1\"", "Cache-Control: max-age=0"),
+        response("", "ETag: \"v1\"", "Cache-Control: max-age=60", status="304 Not Modified"),
+        response("changed", "ETag: \"v2\""),
+    ])
+    url = "http://127.0.0.1:{}/a.js".format(port)
+    assert URL(url).request(None)[1] == "body"
+    headers, body = URL(url).request(None)
+    assert body == "body" and headers["cache-control"] == "max-age=60"  # the 304 updates the headers
+    assert "If-None-Match: \"v1\"" in requests[1]
+    assert URL(url).request(None)[1] == "body"  # fresh now, no request
+    HTTP_CACHE.get(url).stored_at -= 120  # a minute later it is stale again
+    assert URL(url).request(None)[1] == "changed"
+    assert len(requests) == 3
+
+
+def test_post_invalidates() -> None:
+    port, requests = serve([response("first", "Cache-Control: max-age=60"),
+                            response("posted"),
+                            response("second", "Cache-Control: max-age=60")])
+    url = "http://127.0.0.1:{}/".format(port)
+    assert URL(url).request(None)[1] == "first"
+    assert URL(url).request(None, "a=1")[1] == "posted"
+    assert URL(url).request(None)[1] == "second"
+    assert request_lines(requests) == ["GET / HTTP/1.1", "POST / HTTP/1.1", "GET / HTTP/1.1"]
+
+
+def test_least_recently_used_entries_are_evicted() -> None:
+    cache = HTTPCache(max_bytes=250, directory=None)
+    for name in "abc":
+        cache.put(name, {}, b"x" * 100)
+        cache.get("a")  # keeps a recently used
+    assert list(cache.entries) == ["c", "a"] and cache.size == 200
+    cache.put("big", {}, b"x" * 300)  # larger than the budget, not kept in memory
+    assert cache.get("big") is None and list(cache.entries) == ["c", "a"]
+    cache.invalidate("c")
+    assert list(cache.entries) == ["a"] and cache.size == 100
+
+
+def test_disk_store(tmp_path) -> None:
+    cache = HTTPCache(directory=str(tmp_path))
+    cache.put("http://a/x.css", {"etag": "\"1\""}, b"p { color: red; }")
+    cache.put("http://a/y.css", {}, bytes(range(256)))
+    # a new cache, like after a restart
+    restarted = HTTPCache(directory=str(tmp_path))
+    entry = restarted.get("http://a/x.css")
+    assert entry.headers == {"etag": "\"1\""} and entry.body == b"p { color: red; }"
+    assert restarted.get("http://a/y.css").body == bytes(range(256))
+    restarted.invalidate("http://a/x.css")
+    assert HTTPCache(directory=str(tmp_path)).get("http://a/x.css") is None
+    restarted.clear()
+    assert restarted.get("http://a/y.css") is None and list(tmp_path.iterdir()) == []
+
+
+def chunked(data: bytes, size: int) -> bytes:
+    out = b""
+    for i in range(0, len(data), size):
+        piece = data[i:i + size]
+        out += "{:x};ext=1\r\n".format(len(piece)).encode() + piece + b"\r\n"
+    return out + b"0\r\nTrailer: x\r\n\r\n"
+
+
+def raw_deflate(data: bytes) -> bytes:
+    compressor = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush()
+
+
+def test_body_encodings() -> None:
+    text = "".join("line {} with ünïcode ✓\n".format(i) for i in range(5000))
+    data = text.encode("utf8")
+    bodies = [
+        b"Transfer-Encoding: chunked\r\n\r\n" + chunked(data, 1000),  # splits multi-byte characters
+        b"Content-Encoding: gzip\r\nContent-Length: %d\r\n\r\n" % len(gzip.compress(data)) + gzip.compress(data),
+        b"Content-Encoding: deflate\r\nContent-Length: %d\r\n\r\n" % len(zlib.compress(data)) + zlib.compress(data),
+        b"Content-Encoding: deflate\r\nContent-Length: %d\r\n\r\n" % len(raw_deflate(data)) + raw_deflate(data),
+        b"Content-Encoding: gzip\r\nTransfer-Encoding: chunked\r\n\r\n" + chunked(gzip.compress(data), 100),
+    ]
+    # all on one keep-alive connection, so every body has to be read exactly to its end
+    port, requests = serve([b"HTTP/1.1 200 OK\r\n" + body for body in bodies])
+    for i in range(len(bodies)):
+        headers, body = URL("http://127.0.0.1:{}/{}".format(port, i)).request(None)
+        assert body == text, i
+    assert len(requests) == len(bodies)
+
+
+def test_charsets() -> None:
+    latin = "café, naïve".encode("latin-1")
+    port, requests = serve([
+        b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=ISO-8859-1\r\nContent-Length: %d\r\n\r\n"
+        % len(latin) + latin,
+        b"HTTP/1.1 200 OK\r\nContent-Type: text/html; charset=nonsense\r\nContent-Length: 6\r\n\r\n"
+        + b"\xc3\xbc\xc3\xffok",  # unknown charsets are utf-8, broken bytes are replaced
+    ])
+    assert URL("http://127.0.0.1:{}/a".format(port)).request(None)[1] == "café, naïve"
+    assert URL("http://127.0.0.1:{}/b".format(port)).request(None)[1] == "ü\ufffd\ufffdok"
+
+
+def test_closing_a_stream_early_releases_the_connection() -> None:
+    data = b"x" * 300_000
+    port, requests = serve_connections([
+        [b"HTTP/1.1 200 OK\r\nContent-Length: %d\r\n\r\n" % len(data) + data],
+        [b"HTTP/1.1 200 OK\r\nContent-Length: 4\r\n\r\nnext"],
+    ])
+    key = ("http", "127.0.0.1", port)
+    headers, body = URL("http://127.0.0.1:{}/big".format(port)).stream(None)
+    next(body)
+    assert CONNECTION_POOL.in_use[key] == 1
+    body.close()
+    # the rest of the body is still on the socket, so the connection is closed instead of reused
+    assert CONNECTION_POOL.in_use[key] == 0 and not CONNECTION_POOL.idle.get(key)
+    assert URL("http://127.0.0.1:{}/next".format(port)).request(None)[1] == "next"
+    assert len(CONNECTION_POOL.idle[key]) == 1  # read to the end, kept for the next request
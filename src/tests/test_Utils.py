@@ -0,0 +1,37 @@
+import random
+
+from src.benchmarks.Documents import prose_document
+from src.dom.HTMLParser import HTMLParser
+from src.dom.Traversal import pre_order
+from src.layout.DocumentLayout import DocumentLayout
+from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.RuleIndex import RuleIndex
+from src.user_agent.Utils import hit_test
+
+
+def test_hit_test_finds_the_front_most_object() -> None:
+    rules = CSSParser(open("user_agent/browser.css").read()).parse()
+    html = prose_document(40 * 1024).replace(
+        "</body>", "<div><p>a <input name=q> b</p><button>x</button></div><p></p><div></div></body>")
+    root = HTMLParser(html).parse()
+    style(root, RuleIndex(sorted(rules, key=cascade_priority)))
+    document = DocumentLayout(root)
+    document.layout()
+    layout_objects = list(pre_order(document))
+
+    rng = random.Random(0)
+    for i in range(2000):
+        if i % 3 == 0:  # inside a random object, often a small one
+            target = rng.choice(layout_objects)
+            x = target.x + rng.random() * max(target.width, 1)
+            y = target.y + rng.random() * max(target.height, 1)
+        elif i % 3 == 1:  # right on an edge, boxes contain their top left corner
+            target = rng.choice(layout_objects)
+            x, y = target.x, target.y
+        else:
+            x, y = rng.uniform(-5, 820), rng.uniform(-5, document.height + 10)
+        # later objects in the tree are painted on top of earlier ones
+        hits = [layout_object for layout_object in layout_objects
+                if layout_object.x <= x < layout_object.x + layout_object.width
+                and layout_object.y <= y < layout_object.y + layout_object.height]
+        assert hit_test(document, x, y) is (hits[-1] if hits else None), (x, y)
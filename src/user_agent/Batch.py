@@ -0,0 +1,121 @@
+# Renders many pages headless over a process pool.
+# Run from src/: PYTHONPATH=.. python user_agent/Batch.py urls.txt -o out/ [--workers N] [--fonts fixed|<table.json>]
+#
+# Writes out/<index>.json with the display list of every page that rendered, and one timing record
+# per page to out/timings.jsonl. Failures stay with their page:
+# - an exception while rendering (bad markup, network error, ...) is recorded with status "error"
+# - a worker process dying (e.g. a stack overflow in C code) breaks the pool. The pages that were in
+#   flight are rendered again, each alone in a fresh process, and the ones that kill it again are
+#   recorded with status "crashed". Pages that were not started yet go on in a new pool.
+import argparse
+import json
+import os
+import sys
+import time
+import traceback
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
+
+from Headless import font_provider, render
+from src.styling.Fonts import set_font_provider
+
+Job = tuple[int, str, str]  # index, url, output directory
+
+
+def init_worker(fonts: str) -> None:
+    provider = font_provider(fonts)
+    if provider:
+        set_font_provider(provider)
+
+
+def render_job(index: int, url: str, output: str) -> dict:
+    record = {"index": index, "url": url, "pid": os.getpid()}
+    start = time.perf_counter()
+    try:
+        dump = render(url)
+        path = os.path.join(output, "{}.json".format(index))
+        with open(path, "w") as f:
+            json.dump(dump, f)
+        record.update(status="ok", display_list=path, items=len(dump["items"]),
+                      height=dump["height"], timings=dump["timings"])
+    except Exception as e:
+        record.update(status="error", error=repr(e),
+                      where=traceback.extract_tb(e.__traceback__)[-1].name)
+    record["total"] = time.perf_counter() - start
+    return record
+
+
+def crashed(job: Job) -> dict:
+    index, url, output = job
+    return {"index": index, "url": url, "status": "crashed", "error": "worker process died"}
+
+
+# renders jobs until the queue is empty or the pool breaks, then returns the jobs that were in flight
+def run_pool(queue: deque[Job], workers: int, fonts: str, write) -> list[Job]:
+    with ProcessPoolExecutor(workers, initializer=init_worker, initargs=(fonts,)) as pool:
+        in_flight = {}
+        while queue or in_flight:
+            # only as many jobs as workers are submitted, so a broken pool only takes those down
+            while queue and len(in_flight) < workers:
+                job = queue.popleft()
+                in_flight[pool.submit(render_job, *job)] = job
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            broken = False
+            for future in done:
+                try:
+                    write(future.result())
+                    del in_flight[future]
+                except BrokenProcessPool:
+                    broken = True
+            if broken:
+                return list(in_flight.values())
+    return []
+
+
+def run(jobs: list[Job], workers: int, fonts: str, write) -> None:
+    queue = deque(jobs)
+    suspects = []
+    while queue:
+        suspects.extend(run_pool(queue, workers, fonts, write))
+
+    for job in sorted(suspects):
+        # alone in its own process, so a crash can only come from this page
+        if run_pool(deque([job]), 1, fonts, write):
+            write(crashed(job))
+
+
+def read_urls(path: str) -> list[str]:
+    with (sys.stdin if path == "-" else open(path)) as f:
+        return [line.strip() for line in f
+                if line.strip() and not line.startswith("#")]
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Render many pages to display list dumps")
+    parser.add_argument("urls", help="file with one http(s) or file url per line, - for stdin")
+    parser.add_argument("-o", "--output", default="batch", help="directory for the results")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1,
+                        help="worker processes, default one per core")
+    parser.add_argument("--fonts", default="fixed",
+                        help="fixed, tk (needs a display) or a json file with font metrics")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.output, exist_ok=True)
+    jobs = [(index, url, args.output) for index, url in enumerate(read_urls(args.urls))]
+    counts = {}
+    start = time.perf_counter()
+    with open(os.path.join(args.output, "timings.jsonl"), "w") as timings:
+        def write(record: dict) -> None:
+            timings.write(json.dumps(record) + "\n")
+            timings.flush()  # keep what is done if the batch gets killed
+            counts[record["status"]] = counts.get(record["status"], 0) + 1
+
+        run(jobs, args.workers, args.fonts, write)
+
+    print("{} pages in {:.1f}s:".format(len(jobs), time.perf_counter() - start),
+          ", ".join("{} {}".format(count, status) for status, count in sorted(counts.items())))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -4,6 +4,7 @@ from Chrome import Chrome
 from Constants import WIDTH, HEIGHT
 from Tab import Tab
 from URL import URL
+from src.user_agent.Profiler import PROFILER
 
 
 class Browser:
@@ -11,6 +12,7 @@ class Browser:
         self.focus = None
         self.tabs: list[Tab] = []
         self.active_tab: Tab | None = None
+        self.drawn_tab: Tab | None = None  # the tab whose items are on the canvas
         self.window = tkinter.Tk()
         self.canvas = tkinter.Canvas(
             self.window,
@@ -72,14 +74,33 @@ class Browser:
         self.draw()
 
     def draw(self) -> None:
-        self.canvas.delete("all")
-        self.active_tab.draw(self.canvas, self.chrome.bottom)
-        for cmd in self.chrome.paint():
-            cmd.execute(0, self.canvas)  # scroll 0 so that it's drawn at the top
+        with PROFILER.phase("draw"):
+            if self.drawn_tab is not self.active_tab:  # the canvas still shows another tab
+                self.canvas.delete("content")
+                if self.drawn_tab:
+                    self.drawn_tab.forget_canvas()
+                self.drawn_tab = self.active_tab
+            self.active_tab.draw(self.canvas, self.chrome.bottom)
+            self.chrome.draw(self.canvas)
+            self.canvas.tag_raise("chrome")  # new content items are created on top
 
 
 if __name__ == "__main__":
-    import sys
-
-    Browser().new_tab(URL(sys.argv[1]))
+    import argparse
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("url")
+    parser.add_argument("--profile", action="store_true",
+                        help="print time per phase and counters when the window is closed")
+    parser.add_argument("--trace", help="write a chrome trace event file when the window is closed")
+    args = parser.parse_args()
+    if args.profile or args.trace:
+        PROFILER.enable(trace=bool(args.trace))
+
+    Browser().new_tab(URL(args.url))
     tkinter.mainloop()
+
+    if args.profile:
+        print(PROFILER.report())
+    if args.trace:
+        PROFILER.export_trace(args.trace)
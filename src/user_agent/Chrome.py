@@ -7,6 +7,7 @@ from src.drawing.DrawRect import DrawRect
 from src.drawing.DrawText import DrawText
 from src.layout.Rect import Rect
 from src.styling.Fonts import get_font
+from src.user_agent.Profiler import PROFILER
 
 
 class Chrome:
@@ -40,6 +41,7 @@ class Chrome:
 
         self.focus = None
         self.address_bar = ""
+        self.drawn = []  # (canvas item, what it shows) for every command of the last paint
 
     def tab_rect(self, index: int):
         tabs_start = self.newtab_rect.right + self.padding
@@ -142,5 +144,31 @@ class Chrome:
 
         return cmds
 
+    # updates the chrome's canvas items in place, only changed ones cost a call to Tk
+    def draw(self, canvas) -> None:
+        cmds = self.paint()
+        states = [drawn_state(cmd) for cmd in cmds]
+        if [state[0] for state in states] != [state[0] for item, state in self.drawn]:
+            # different items, e.g. a new tab. Made again so they stack in paint order
+            canvas.delete("chrome")
+            self.drawn = [(cmd.execute(0, canvas, tags=("chrome",)), state)
+                          for cmd, state in zip(cmds, states)]
+            if PROFILER.enabled:
+                PROFILER.count("canvas items created", len(cmds))
+            return
+
+        for i, (cmd, state) in enumerate(zip(cmds, states)):
+            item, old_state = self.drawn[i]
+            if state != old_state:
+                cmd.update(0, canvas, item)
+                self.drawn[i] = (item, state)
+
     def blur(self):
         self.focus = None
+
+
+# what a draw command shows, equal for commands that draw the same
+def drawn_state(cmd) -> tuple:
+    rect = cmd.rect
+    return type(cmd), (rect.left, rect.top, rect.right, rect.bottom), \
+        {name: value for name, value in vars(cmd).items() if name != "rect"}
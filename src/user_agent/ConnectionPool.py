@@ -0,0 +1,97 @@
+import socket
+import ssl
+import threading
+import time
+
+from Constants import MAX_CONNECTIONS_PER_HOST, KEEP_ALIVE_TIMEOUT
+
+
+class Connection:
+    def __init__(self, key: tuple[str, str, int], sock: socket.socket) -> None:
+        self.key = key
+        self.sock = sock
+        # the buffered reader has to live as long as the socket,
+        # otherwise bytes it already pulled from the socket get lost
+        self.file = sock.makefile("rb")
+        self.last_used = time.monotonic()
+
+    def send(self, data: bytes) -> None:
+        self.sock.sendall(data)
+
+    def close(self) -> None:
+        self.file.close()
+        self.sock.close()
+
+
+class ConnectionPool:
+    def __init__(self, max_per_host: int = MAX_CONNECTIONS_PER_HOST,
+                 idle_timeout: float = KEEP_ALIVE_TIMEOUT) -> None:
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.idle: dict[tuple[str, str, int], list[Connection]] = {}
+        self.in_use: dict[tuple[str, str, int], int] = {}
+        self.tls_sessions: dict[tuple[str, str, int], ssl.SSLSession] = {}
+        self.ssl_context = ssl.create_default_context()
+        self.lock = threading.Condition()
+
+    # returns the connection and whether it was reused (and might be stale)
+    def acquire(self, scheme: str, host: str, port: int) -> tuple[Connection, bool]:
+        key = (scheme, host, port)
+        with self.lock:
+            while True:
+                self.close_expired(key)
+                idle = self.idle.get(key, [])
+                if idle:
+                    conn = idle.pop()  # most recently used one
+                    self.in_use[key] = self.in_use.get(key, 0) + 1
+                    return conn, True
+                if self.in_use.get(key, 0) < self.max_per_host:
+                    self.in_use[key] = self.in_use.get(key, 0) + 1
+                    break
+                self.lock.wait()  # per host cap reached, wait for a release
+
+        try:
+            return self.connect(key), False
+        except Exception:
+            self.release(None, key)
+            raise
+
+    def release(self, conn: Connection | None, key: tuple[str, str, int] | None = None,
+                reusable: bool = False) -> None:
+        key = conn.key if conn else key
+        with self.lock:
+            self.in_use[key] -= 1
+            if conn and reusable:
+                conn.last_used = time.monotonic()
+                self.idle.setdefault(key, []).append(conn)
+            elif conn:
+                conn.close()
+            self.lock.notify()
+
+    def connect(self, key: tuple[str, str, int]) -> Connection:
+        scheme, host, port = key
+        s = socket.socket(family=socket.AF_INET, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP)
+        s.connect((host, port))
+        if scheme == "https":
+            # resume the previous tls session to skip the full handshake
+            s = self.ssl_context.wrap_socket(s, server_hostname=host,
+                                             session=self.tls_sessions.get(key))
+            self.tls_sessions[key] = s.session
+        return Connection(key, s)
+
+    def close_expired(self, key: tuple[str, str, int]) -> None:
+        now = time.monotonic()
+        idle = self.idle.get(key, [])
+        for conn in [conn for conn in idle if now - conn.last_used > self.idle_timeout]:
+            idle.remove(conn)
+            conn.close()
+
+    def close_all(self) -> None:
+        with self.lock:
+            for idle in self.idle.values():
+                for conn in idle:
+                    conn.close()
+            self.idle.clear()
+
+
+CONNECTION_POOL = ConnectionPool()
@@ -4,3 +4,10 @@ SCROLL_STEP = 100
 INPUT_WIDTH_PX = 200
 
 COOKIE_JAR = {}
+
+MAX_CONNECTIONS_PER_HOST = 6
+KEEP_ALIVE_TIMEOUT = 15  # seconds an idle connection is kept open
+MAX_INFLIGHT_PER_ORIGIN = 6  # parallel subresource downloads per origin
+
+HTTP_CACHE_BYTES = 16 * 1024 * 1024  # memory budget of the http cache
+HTTP_CACHE_DIR = None  # directory to keep the http cache across restarts, None to keep it in memory only
@@ -0,0 +1,32 @@
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from Constants import MAX_INFLIGHT_PER_ORIGIN
+from URL import URL
+
+
+class Fetcher:
+    def __init__(self, max_per_origin: int = MAX_INFLIGHT_PER_ORIGIN, max_workers: int = 16) -> None:
+        self.max_per_origin = max_per_origin
+        self.executor = ThreadPoolExecutor(max_workers=max_workers,
+                                           thread_name_prefix="fetch")
+        self.slots: dict[tuple, threading.Semaphore] = {}
+        self.lock = threading.Lock()
+
+    # starts the download right away, the caller blocks on the result when it needs the body
+    def fetch(self, url: URL, referrer: URL | None) -> Future:
+        return self.executor.submit(self.request, url, referrer)
+
+    def request(self, url: URL, referrer: URL | None):
+        with self.slot(url):
+            return url.request(referrer)
+
+    def slot(self, url: URL) -> threading.Semaphore:
+        key = (url.scheme, url.host, url.port)
+        with self.lock:
+            if key not in self.slots:
+                self.slots[key] = threading.Semaphore(self.max_per_origin)
+            return self.slots[key]
+
+
+FETCHER = Fetcher()
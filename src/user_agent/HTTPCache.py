@@ -0,0 +1,153 @@
+import base64
+import hashlib
+import json
+import os
+import threading
+import time
+from collections import OrderedDict
+
+from Constants import HTTP_CACHE_BYTES, HTTP_CACHE_DIR
+
+
+def cache_control(headers: dict[str, str]) -> dict[str, str]:
+    directives = {}
+    for directive in headers.get("cache-control", "").split(","):
+        if "=" in directive:
+            name, value = directive.split("=", 1)
+            directives[name.strip().casefold()] = value.strip().strip('"')
+        elif directive.strip():
+            directives[directive.strip().casefold()] = ""
+    return directives
+
+
+class CacheEntry:
+    def __init__(self, headers: dict[str, str], body: bytes, stored_at: float) -> None:
+        self.headers = headers
+        self.body = body
+        self.stored_at = stored_at
+
+    def size(self) -> int:
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers.items())
+
+    def is_fresh(self) -> bool:
+        directives = cache_control(self.headers)
+        if "no-cache" in directives or "max-age" not in directives:
+            return False  # has to be revalidated with the server first
+        try:
+            max_age = int(directives["max-age"])
+        except ValueError:
+            return False
+        return time.time() - self.stored_at < max_age
+
+    def validators(self) -> dict[str, str]:
+        validators = {}
+        if "etag" in self.headers:
+            validators["If-None-Match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            validators["If-Modified-Since"] = self.headers["last-modified"]
+        return validators
+
+
+class HTTPCache:
+    def __init__(self, max_bytes: int = HTTP_CACHE_BYTES, directory: str | None = HTTP_CACHE_DIR) -> None:
+        self.max_bytes = max_bytes
+        self.directory = directory
+        self.entries: OrderedDict[str, CacheEntry] = OrderedDict()  # least recently used first
+        self.size = 0
+        self.lock = threading.Lock()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def get(self, url: str) -> CacheEntry | None:
+        with self.lock:
+            if url in self.entries:
+                self.entries.move_to_end(url)
+                return self.entries[url]
+        entry = self.load(url)
+        if entry:
+            with self.lock:
+                self.remember(url, entry)
+        return entry
+
+    @staticmethod
+    def is_storable(status: str, headers: dict[str, str]) -> bool:
+        directives = cache_control(headers)
+        if status != "200" or "no-store" in directives or "set-cookie" in headers:
+            return False
+        return "max-age" in directives or "etag" in headers or "last-modified" in headers
+
+    def put(self, url: str, headers: dict[str, str], body: bytes) -> CacheEntry:
+        entry = CacheEntry(headers, body, time.time())
+        with self.lock:
+            self.remember(url, entry)
+        self.save(url, entry)
+        return entry
+
+    # a 304 Not Modified response confirms the stored body and updates the headers
+    def revalidated(self, url: str, entry: CacheEntry, headers: dict[str, str]) -> CacheEntry:
+        updated = dict(entry.headers)
+        for header, value in headers.items():
+            if header not in ["content-length", "set-cookie"]:
+                updated[header] = value
+        return self.put(url, updated, entry.body)
+
+    def invalidate(self, url: str) -> None:
+        with self.lock:
+            if url in self.entries:
+                self.size -= self.entries.pop(url).size()
+        if self.directory and os.path.exists(self.path(url)):
+            os.remove(self.path(url))
+
+    # forgets every entry, in memory and on disk
+    def clear(self) -> None:
+        with self.lock:
+            self.entries.clear()
+            self.size = 0
+        if self.directory:
+            for name in os.listdir(self.directory):
+                if len(name) == 64:  # the sha256 names of the entries
+                    os.remove(os.path.join(self.directory, name))
+
+    def remember(self, url: str, entry: CacheEntry) -> None:
+        if url in self.entries:
+            self.size -= self.entries.pop(url).size()
+        if entry.size() > self.max_bytes:
+            return  # would evict everything else, only keep it on disk
+        self.entries[url] = entry
+        self.size += entry.size()
+        while self.size > self.max_bytes:
+            _, evicted = self.entries.popitem(last=False)
+            self.size -= evicted.size()
+
+    def path(self, url: str) -> str:
+        return os.path.join(self.directory, hashlib.sha256(url.encode("utf8")).hexdigest())
+
+    def save(self, url: str, entry: CacheEntry) -> None:
+        if not self.directory:
+            return
+        record = {
+            "url": url,
+            "headers": entry.headers,
+            "body": base64.b64encode(entry.body).decode("ascii"),
+            "stored_at": entry.stored_at,
+        }
+        # write to a temporary file first, so a crash never leaves half an entry behind
+        tmp = self.path(url) + ".tmp"
+        with open(tmp, "w") as file:
+            json.dump(record, file)
+        os.replace(tmp, self.path(url))
+
+    def load(self, url: str) -> CacheEntry | None:
+        if not self.directory or not os.path.exists(self.path(url)):
+            return None
+        try:
+            with open(self.path(url)) as file:
+                record = json.load(file)
+        except (OSError, ValueError):
+            return None
+        if record.get("url") != url:  # hash collision
+            return None
+        return CacheEntry(record["headers"], base64.b64decode(record["body"]), record["stored_at"])
+
+
+HTTP_CACHE = HTTPCache()
@@ -0,0 +1,65 @@
+# Renders a page without a window and dumps its display list as json.
+# Run from src/: PYTHONPATH=.. python user_agent/Headless.py <url> [-o out.json] [--fonts fixed|<table.json>]
+#                [--profile] [--trace trace.json]
+import argparse
+import json
+import sys
+
+from Constants import HEIGHT
+from Tab import Tab
+from URL import URL
+from src.drawing.RecordingCanvas import RecordingCanvas
+from src.styling.Fonts import set_font_provider
+from src.styling.TableFont import TableFontProvider
+from src.user_agent.Profiler import PROFILER
+
+
+def render(url: str, scripts: bool = False) -> dict:
+    tab = Tab(HEIGHT, scripts=scripts)
+    tab.load(URL(url))
+    canvas = RecordingCanvas()
+    for cmd in tab.display_list:  # the whole page, not only the visible part
+        cmd.execute(0, canvas)
+    return {"url": url, "height": tab.document.height, "timings": tab.timings, "items": canvas.items}
+
+
+def font_provider(fonts: str):
+    if fonts == "tk":
+        return None  # keep the default
+    if fonts == "fixed":
+        return TableFontProvider.fixed()
+    return TableFontProvider.load(fonts)
+
+
+def main(argv: list[str]) -> None:
+    parser = argparse.ArgumentParser(description="Render a page to a display list dump")
+    parser.add_argument("url", help="http(s) or file url")
+    parser.add_argument("-o", "--output", help="file for the json dump, default stdout")
+    parser.add_argument("--fonts", default="fixed",
+                        help="fixed, tk (needs a display) or a json file with font metrics")
+    parser.add_argument("--scripts", action="store_true", help="run the page's javascript")
+    parser.add_argument("--profile", action="store_true", help="print time per phase and counters to stderr")
+    parser.add_argument("--trace", help="write a chrome trace event file")
+    args = parser.parse_args(argv)
+
+    provider = font_provider(args.fonts)
+    if provider:
+        set_font_provider(provider)
+    if args.profile or args.trace:
+        PROFILER.enable(trace=bool(args.trace))
+
+    dump = render(args.url, args.scripts)
+    if args.profile:
+        print(PROFILER.report(), file=sys.stderr)
+    if args.trace:
+        PROFILER.export_trace(args.trace)
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(dump, f)
+    else:
+        json.dump(dump, sys.stdout)
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+from contextlib import nullcontext
+
+NO_PHASE = nullcontext()
+
+
+class Phase:
+    def __init__(self, profiler, name: str, timings: dict | None) -> None:
+        self.profiler = profiler
+        self.name = name
+        self.timings = timings
+        self.start = None
+
+    def __enter__(self):
+        self.profiler.local.depth = self.profiler.depth() + 1
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        end = time.perf_counter()
+        elapsed = end - self.start
+        profiler = self.profiler
+        depth = profiler.local.depth = profiler.depth() - 1
+        if self.timings is not None:
+            self.timings[self.name] = elapsed
+        if not profiler.enabled:
+            return
+        with profiler.lock:
+            calls, total = profiler.phases.get(self.name, (0, 0.0))
+            profiler.phases[self.name] = (calls + 1, total + elapsed)
+            if profiler.tracing:
+                profiler.trace_event(self.name, self.start, elapsed)
+                if depth == 0:  # counters at the end of every outermost phase of a thread
+                    profiler.trace_counters(end)
+
+
+class Profiler:
+    # does nothing until enabled, call sites check enabled before counting.
+    # Fetcher threads use it too: phases nest per thread and updates take the lock
+    def __init__(self) -> None:
+        self.enabled = False
+        self.tracing = False
+        self.phases: dict[str, tuple[int, float]] = {}  # name -> calls, seconds
+        self.counters: dict[str, int] = {}
+        self.events: list[dict] = []  # chrome trace events, only while tracing
+        self.origin = time.perf_counter()
+        self.local = threading.local()  # depth: phases open in this thread
+        self.lock = threading.Lock()
+
+    def enable(self, trace: bool = False) -> None:
+        self.enabled = True
+        self.tracing = trace
+
+    def disable(self) -> None:
+        self.enabled = False
+        self.tracing = False
+
+    def reset(self) -> None:
+        with self.lock:
+            self.phases.clear()
+            self.counters.clear()
+            self.events.clear()
+            self.origin = time.perf_counter()
+
+    def depth(self) -> int:
+        return getattr(self.local, "depth", 0)
+
+    # times a with block. Its seconds also go into timings if given, even while disabled
+    def phase(self, name: str, timings: dict | None = None):
+        if not self.enabled and timings is None:
+            return NO_PHASE
+        return Phase(self, name, timings)
+
+    def count(self, name: str, n: int = 1) -> None:
+        with self.lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    # a counter that is set to the current value instead of adding up
+    def gauge(self, name: str, value: int) -> None:
+        with self.lock:
+            self.counters[name] = value
+
+    # trace_event and trace_counters are called with the lock held
+    def trace_event(self, name: str, start: float, elapsed: float) -> None:
+        self.events.append({"name": name, "ph": "X", "ts": (start - self.origin) * 1e6,
+                            "dur": elapsed * 1e6, "pid": os.getpid(), "tid": threading.get_ident()})
+
+    def trace_counters(self, when: float) -> None:
+        self.events.append({"name": "counters", "ph": "C", "ts": (when - self.origin) * 1e6,
+                            "pid": os.getpid(), "args": dict(self.counters)})
+
+    # chrome://tracing and https://ui.perfetto.dev can open the file
+    def export_trace(self, path: str) -> None:
+        with self.lock:
+            events = list(self.events)
+        with open(path, "w") as f:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, f)
+
+    def report(self) -> str:
+        with self.lock:
+            phases, counters = dict(self.phases), dict(self.counters)
+        lines = ["{:<20}{:>8}{:>12}{:>12}".format("phase", "calls", "total", "mean")]
+        for name, (calls, total) in sorted(phases.items(), key=lambda item: -item[1][1]):
+            lines.append("{:<20}{:>8}{:>10.1f}ms{:>10.2f}ms".format(
+                name, calls, total * 1000, total / calls * 1000))
+        for name, value in sorted(counters.items()):
+            lines.append("{:<20}{:>8}".format(name, value))
+        return "\n".join(lines)
+
+
+PROFILER = Profiler()
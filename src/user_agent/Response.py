@@ -0,0 +1,130 @@
+import codecs
+import zlib
+from typing import Iterator
+
+from ConnectionPool import CONNECTION_POOL, Connection
+
+CHUNK_SIZE = 64 * 1024
+SUPPORTED_ENCODINGS = ["gzip", "deflate"]
+
+
+def get_charset(headers: dict[str, str]) -> str:
+    # e.g. Content-Type: text/html; charset=ISO-8859-1
+    for param in headers.get("content-type", "").split(";")[1:]:
+        if "=" in param:
+            name, value = param.split("=", 1)
+            if name.strip().casefold() == "charset":
+                try:
+                    return codecs.lookup(value.strip().strip('"')).name
+                except LookupError:
+                    break  # unknown charset, fall back to the default
+    return "utf-8"
+
+
+def decode_body(chunks, headers: dict[str, str]) -> Iterator[str]:
+    # incremental, so multi-byte characters split between two chunks are decoded correctly
+    decoder = codecs.getincrementaldecoder(get_charset(headers))(errors="replace")
+    for chunk in chunks:
+        text = decoder.decode(chunk)
+        if text:
+            yield text
+    text = decoder.decode(b"", final=True)
+    if text:
+        yield text
+
+
+class ResponseBody:
+    def __init__(self, conn: Connection, headers: dict[str, str], has_body: bool, keep_alive: bool) -> None:
+        self.conn = conn
+        self.keep_alive = keep_alive
+        encoding = headers.get("content-encoding", "identity").strip().casefold()
+        if has_body:
+            chunks = self.read(headers)
+        else:
+            chunks = iter([])
+        if encoding != "identity":
+            chunks = self.decompress(chunks, encoding)
+        self.chunks = chunks
+
+    def __iter__(self) -> Iterator[bytes]:
+        return self
+
+    def __next__(self) -> bytes:
+        if not self.conn:
+            raise StopIteration
+        try:
+            return next(self.chunks)
+        except StopIteration:
+            self.release(self.keep_alive)
+            raise
+        except Exception:
+            self.release(False)
+            raise
+
+    # stop reading early, the rest of the body is still on the socket so it can't be reused
+    def close(self) -> None:
+        if self.conn:
+            self.release(False)
+
+    def __del__(self) -> None:
+        self.close()
+
+    def release(self, reusable: bool) -> None:
+        CONNECTION_POOL.release(self.conn, reusable=reusable)
+        self.conn = None
+
+    def read(self, headers: dict[str, str]) -> Iterator[bytes]:
+        file = self.conn.file
+        if headers.get("transfer-encoding", "").casefold() == "chunked":
+            # each chunk: <size in hex>\r\n<data>\r\n, the last chunk has size 0
+            while True:
+                size = int(file.readline().split(b";", 1)[0].strip(), 16)
+                if size == 0:
+                    break
+                data = file.read(size)
+                if len(data) < size:
+                    raise ConnectionError("Connection closed inside a chunk")
+                file.readline()
+                yield data
+            while file.readline() not in (b"\r\n", b"\n", b""):
+                pass  # skip trailers
+
+        elif "content-length" in headers:
+            remaining = int(headers["content-length"])
+            while remaining > 0:
+                data = file.read(min(CHUNK_SIZE, remaining))
+                if not data:
+                    raise ConnectionError("Connection closed before the end of the body")
+                remaining -= len(data)
+                yield data
+
+        else:  # body ends when the server closes the connection
+            self.keep_alive = False
+            while data := file.read(CHUNK_SIZE):
+                yield data
+
+    @staticmethod
+    def decompress(chunks: Iterator[bytes], encoding: str) -> Iterator[bytes]:
+        if encoding == "gzip":
+            decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS)
+        elif encoding == "deflate":
+            decompressor = zlib.decompressobj()
+        else:
+            raise ValueError("Unsupported content encoding " + encoding)
+
+        first = True
+        for chunk in chunks:
+            try:
+                data = decompressor.decompress(chunk)
+            except zlib.error:
+                if not (first and encoding == "deflate"):
+                    raise
+                # some servers send raw deflate data without the zlib header
+                decompressor = zlib.decompressobj(-zlib.MAX_WBITS)
+                data = decompressor.decompress(chunk)
+            first = False
+            if data:
+                yield data
+        data = decompressor.flush()
+        if data:
+            yield data
@@ -1,42 +1,72 @@
-from tkinter import Canvas
+from typing import TYPE_CHECKING
 from urllib import parse
 
 from Constants import *
+from Fetcher import FETCHER
+from Response import decode_body
 from URL import URL
-from Utils import tree_to_list, paint_tree
-from src.dom.Element import Element
+from Utils import hit_test, paint_tree
 from src.dom.HTMLParser import HTMLParser
 from src.dom.Text import Text
+from src.dom.Traversal import elements
+from src.drawing.DisplayListIndex import DisplayListIndex
 from src.js.JSContext import JSContext
 from src.layout.DocumentLayout import DocumentLayout
-from src.styling.CSSParser import CSSParser, cascade_priority, style
+from src.styling.CSSParser import style
+from src.styling.StyleSheetCache import STYLE_SHEET_CACHE
+from src.user_agent.Profiler import PROFILER
 
-DEFAULT_STYLE_SHEET = CSSParser(open("user_agent/browser.css").read()).parse()
+if TYPE_CHECKING:
+    from tkinter import Canvas
+
+DEFAULT_STYLE_SHEET = STYLE_SHEET_CACHE.parse(open("user_agent/browser.css").read())
 
 
 class Tab:
-    def __init__(self, tab_height) -> None:
+    def __init__(self, tab_height, scripts: bool = True) -> None:
         self.allowed_origins = None
         self.js = None
-        self.rules = None
+        self.scripts = scripts  # False loads pages without running javascript, e.g. headless
+        self.style_sheets = []  # in cascade order, the default style sheet first
+        self.rule_index = None  # the cascade of self.style_sheets, None when they changed
+        self.restyled_nodes = 0  # how many nodes the last render had to restyle
+        self.timings: dict[str, float] = {}  # seconds per phase of the last load and render
         self.tab_height = tab_height
         self.url: URL | None = None
         self.document = None
         self.nodes = None
         self.display_list = []
+        self.display_index = DisplayListIndex(tab_height)  # what to draw for a scroll position
+        self.canvas_items = {}  # command -> id of its item on the canvas, for the visible commands
+        self.canvas_scroll = None  # the scroll position the canvas items are at
         self.scroll = 0
         self.history = []
         self.focus = None
 
     def load(self, url: URL, payload: str | None = None) -> None:
-        self.scroll = 0
+        with PROFILER.phase("load"):
+            self.scroll = 0
+            self.timings = {}
 
-        self.history.append(url)
-        headers, body = url.request(self.url, payload)
-        self.url = url  # has to be set after request
+            self.history.append(url)
+            with PROFILER.phase("fetch+parse", self.timings):
+                headers, body = url.stream(self.url, payload)
+                self.url = url  # has to be set after request
 
-        self.nodes = HTMLParser(body).parse()
-        self.rules = DEFAULT_STYLE_SHEET.copy()
+                # parse the page while it is still arriving
+                parser = HTMLParser()
+                for text in decode_body(body, headers):
+                    parser.feed(text)
+                self.nodes = parser.close()
+
+            with PROFILER.phase("subresources", self.timings):
+                self.load_subresources(url, headers)
+
+            self.render()
+
+    def load_subresources(self, url: URL, headers: dict[str, str]) -> None:
+        self.style_sheets = [DEFAULT_STYLE_SHEET]
+        self.rule_index = None
 
         self.allowed_origins = None
         if "content-security-policy" in headers:
@@ -46,52 +76,79 @@ class Tab:
                 for origin in csp[1:]:
                     self.allowed_origins.append(URL(origin).origin())
 
-        scripts = [node.attributes["src"] for node
-                   in tree_to_list(self.nodes, [])
-                   if isinstance(node, Element)
-                   and node.tag == "script"
-                   and "src" in node.attributes]
-        self.js = JSContext(self)
+        scripts = self.script_sources() if self.scripts else []
+        # start every allowed download right away, the bodies are used in document order below
+        downloads = {}
+        for src in scripts + self.stylesheet_links():
+            sub_url = url.resolve(src)
+            if self.allowed_request(sub_url) and str(sub_url) not in downloads:
+                downloads[str(sub_url)] = FETCHER.fetch(sub_url, url)
+
+        self.js = JSContext(self) if self.scripts else None
         for script in scripts:
             script_url = url.resolve(script)
             if not self.allowed_request(script_url):
                 print("Blocked script", script, "due to CSP")
                 continue
             try:
-                header, body = script_url.request(url)
+                header, body = self.download(downloads, script_url)
             except Exception:
                 continue
-            self.js.run(script, body)
-
-        links = [node.attributes["href"]
-                 for node in tree_to_list(self.nodes, [])
-                 if isinstance(node, Element)
-                 and node.tag == "link"
-                 and node.attributes.get("rel") == "stylesheet"
-                 and "href" in node.attributes]
-        for link in links:
+            with PROFILER.phase("script"):
+                self.js.run(script, body)
+
+        # scripts might have changed the document, so look for stylesheets again
+        for link in self.stylesheet_links():
             style_url = url.resolve(link)
             if not self.allowed_request(style_url):
                 print("Blocked stylesheet", link, "due to CSP")
                 continue
             try:
-                header, body = style_url.request(url)
+                header, body = self.download(downloads, style_url)
             except Exception:
                 continue
-            self.rules.extend(CSSParser(body).parse())
-
-        self.render()
+            with PROFILER.phase("parse css"):
+                self.style_sheets.append(STYLE_SHEET_CACHE.parse(body))
+            self.rule_index = None
+
+    def script_sources(self) -> list[str]:
+        return [node.attributes["src"] for node
+                in elements(self.nodes, "script")
+                if "src" in node.attributes]
+
+    def stylesheet_links(self) -> list[str]:
+        return [node.attributes["href"]
+                for node in elements(self.nodes, "link")
+                if node.attributes.get("rel") == "stylesheet"
+                and "href" in node.attributes]
+
+    def download(self, downloads: dict, url: URL):
+        if str(url) not in downloads:  # not known when the page was parsed
+            downloads[str(url)] = FETCHER.fetch(url, self.url)
+        return downloads[str(url)].result()
 
     def allowed_request(self, url):
         return self.allowed_origins is None or \
             url.origin() in self.allowed_origins
 
     def render(self):
-        style(self.nodes, sorted(self.rules, key=cascade_priority))
-        self.document = DocumentLayout(self.nodes)
-        self.document.layout()
-        self.display_list = []
-        paint_tree(self.document, self.display_list)
+        with PROFILER.phase("render"):
+            with PROFILER.phase("style", self.timings):
+                force = self.rule_index is None  # new rules can change the style of every node
+                if force:
+                    self.rule_index = STYLE_SHEET_CACHE.cascade(self.style_sheets)
+                self.restyled_nodes = style(self.nodes, self.rule_index, force=force)
+            with PROFILER.phase("layout", self.timings):
+                if self.document is None or self.document.node is not self.nodes:
+                    self.document = DocumentLayout(self.nodes)
+                self.document.layout()  # only lays out what changed since the last render
+            with PROFILER.phase("paint", self.timings):
+                self.display_list = []
+                paint_tree(self.document, self.display_list)
+                self.display_index.update(self.display_list)
+        if PROFILER.enabled:
+            PROFILER.count("nodes styled", self.restyled_nodes)
+            PROFILER.count("display commands", len(self.display_list))
 
     def go_back(self):
         if len(self.history) > 1:
@@ -99,13 +156,38 @@ class Tab:
             back = self.history.pop()
             self.load(back)
 
-    def draw(self, canvas: Canvas, offset):
-        for cmd in self.display_list:
-            if cmd.rect.top > self.scroll + self.tab_height:
-                continue
-            if cmd.rect.bottom < self.scroll:
-                continue
-            cmd.execute(self.scroll - offset, canvas)
+    # keeps the canvas items of the visible commands between frames: scrolling moves them all
+    # at once and only commands that come into view get new items
+    def draw(self, canvas: "Canvas", offset):
+        visible = self.display_index.visible(self.scroll, self.scroll + self.tab_height)
+        if self.canvas_items and self.canvas_scroll != self.scroll:
+            canvas.move("content", 0, self.canvas_scroll - self.scroll)
+        self.canvas_scroll = self.scroll
+
+        keep = set(visible)
+        gone = [cmd for cmd in self.canvas_items if cmd not in keep]
+        if gone:
+            canvas.delete(*[self.canvas_items.pop(cmd) for cmd in gone])
+
+        # new items are created in paint order, below the next item that was already there
+        below = [None] * len(visible)
+        following = None
+        for i in range(len(visible) - 1, -1, -1):
+            below[i] = following
+            following = self.canvas_items.get(visible[i], following)
+        for cmd, next_item in zip(visible, below):
+            if cmd not in self.canvas_items:
+                item = cmd.execute(self.scroll - offset, canvas, tags=("content",))
+                if next_item is not None:
+                    canvas.tag_lower(item, next_item)
+                self.canvas_items[cmd] = item
+                if PROFILER.enabled:
+                    PROFILER.count("canvas items created")
+
+    # the canvas was cleared or is used by another tab now
+    def forget_canvas(self) -> None:
+        self.canvas_items = {}
+        self.canvas_scroll = None
 
     def scrolldown(self):
         max_y = max(self.document.height + 2 * VSTEP - self.tab_height, 0)
@@ -116,7 +198,7 @@ class Tab:
 
     def keypress(self, char):
         if self.focus:
-            if self.js.dispatch_event("keydown", self.focus):
+            if self.js and self.js.dispatch_event("keydown", self.focus):
                 return
 
             self.focus.attributes["value"] += char
@@ -129,24 +211,19 @@ class Tab:
 
         y += self.scroll  # y is a screen coordinate, we want page coordinate
 
-        objs = [obj for obj in tree_to_list(self.document, [])
-                if obj.x <= x < obj.x + obj.width
-                and obj.y <= y < obj.y + obj.height]
-
-        if not objs:
+        # layout objects can overlap, i.e. a div containing a link, or a text inside a link.
+        # hit_test returns the one on top (in front) - the most specific one
+        obj = hit_test(self.document, x, y)
+        if obj is None:
             return self.render()
 
-        # objs is a list since the layout objects can overlap
-        # i.e. a div containing a link, or a text inside a link
-        # the list contains the layout objects from the back to the front
-        # we then get the last one, so the one on top (in front) - the most specific one
-        elt = objs[-1].node  # get the html element
+        elt = obj.node  # get the html element
         while elt:
             if isinstance(elt, Text):
                 pass  # if text just walk up the dom
 
             elif elt.tag == "a" and "href" in elt.attributes:
-                if self.js.dispatch_event("click", elt):
+                if self.js and self.js.dispatch_event("click", elt):
                     return None
 
                 url = self.url.resolve(elt.attributes["href"])
@@ -154,7 +231,7 @@ class Tab:
                 return None
 
             elif elt.tag == "input":
-                if self.js.dispatch_event("click", elt):
+                if self.js and self.js.dispatch_event("click", elt):
                     return None
 
                 self.focus = elt
@@ -164,7 +241,7 @@ class Tab:
                 return None
 
             elif elt.tag == "button":
-                if self.js.dispatch_event("click", elt):
+                if self.js and self.js.dispatch_event("click", elt):
                     return None
 
                 while elt:
@@ -178,13 +255,11 @@ class Tab:
         return None
 
     def submit_form(self, elt):
-        if self.js.dispatch_event("submit", elt):
+        if self.js and self.js.dispatch_event("submit", elt):
             return
 
-        inputs = [node for node in tree_to_list(elt, [])
-                  if isinstance(node, Element)
-                  and node.tag == "input"
-                  and "name" in node.attributes]
+        inputs = [node for node in elements(elt, "input")
+                  if "name" in node.attributes]
 
         body = ""
         for input in inputs:
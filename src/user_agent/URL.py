@@ -1,8 +1,9 @@
-import socket
-import ssl
-from typing import Any
+from typing import Any, Iterator
 
+from ConnectionPool import CONNECTION_POOL, Connection
 from Constants import COOKIE_JAR
+from HTTPCache import HTTP_CACHE
+from Response import CHUNK_SIZE, SUPPORTED_ENCODINGS, ResponseBody, decode_body
 
 
 class URL:
@@ -36,17 +37,31 @@ class URL:
         if self.scheme == "file":
             return {}, self.open_file()
 
-        # setup tcp connection
-        s = socket.socket(family=socket.AF_INET, type=socket.SOCK_STREAM, proto=socket.IPPROTO_TCP)
-        s.connect((self.host, self.port))
-        if self.scheme == "https":
-            ctx = ssl.create_default_context()
-            s = ctx.wrap_socket(s, server_hostname=self.host)
+        headers, body = self.stream(referrer, payload)
+        return headers, "".join(decode_body(body, headers))
+
+    # like request, but the body is an iterator over the (decompressed) bytes as they arrive
+    def stream(self, referrer, payload: str | None = None) -> tuple[dict[Any, Any], Iterator[bytes]]:
+        if self.scheme == "file":
+            return {}, self.read_file()
 
         # send request
         method = "POST" if payload else "GET"
-        request = "{} {} HTTP/1.0\r\n".format(method, self.path)
+        cached = None
+        if method == "GET":
+            cached = HTTP_CACHE.get(str(self))
+            if cached and cached.is_fresh():
+                return cached.headers, iter([cached.body])
+        else:  # the POST might change the resource
+            HTTP_CACHE.invalidate(str(self))
+
+        request = "{} {} HTTP/1.1\r\n".format(method, self.path)
         request += "Host: {}\r\n".format(self.host)
+        request += "Connection: keep-alive\r\n"
+        request += "Accept-Encoding: {}\r\n".format(", ".join(SUPPORTED_ENCODINGS))
+        if cached:  # ask the server whether our stale copy can still be used
+            for header, value in cached.validators().items():
+                request += "{}: {}\r\n".format(header, value)
 
         if self.host in COOKIE_JAR:
             cookie, params = COOKIE_JAR[self.host]
@@ -66,16 +81,32 @@ class URL:
         if payload:
             request += payload
 
-        s.send(request.encode("utf8"))
-
-        # read response - e.g.: HTTP/1.0 200 OK
-        response = s.makefile("r", encoding="utf8", newline="\r\n")
-        statusline = response.readline()
-        version, status, explanation = statusline.split(" ", 2)
-        response_headers = {}
-        while (line := response.readline()) != "\r\n":
-            header, value = line.split(":", 1)
-            response_headers[header.casefold()] = value.strip()
+        # reuse an idle keep-alive connection to the same origin if there is one
+        conn, reused = CONNECTION_POOL.acquire(self.scheme, self.host, self.port)
+        try:
+            statusline = self.send(conn, request, reused)
+            if not statusline and reused:
+                # the server closed the idle connection in the meantime, retry once on a new one
+                CONNECTION_POOL.release(conn)
+                conn, reused = CONNECTION_POOL.acquire(self.scheme, self.host, self.port)
+                statusline = self.send(conn, request, reused)
+            if not statusline:
+                raise ConnectionError("{} closed the connection without a response".format(self.host))
+
+            # read response - e.g.: HTTP/1.1 200 OK
+            while True:
+                version, status, explanation = statusline.split(" ", 2)
+                response_headers = {}
+                while (line := conn.file.readline()) not in (b"\r\n", b"\n", b""):
+                    header, value = line.decode("utf8").split(":", 1)
+                    response_headers[header.casefold()] = value.strip()
+                # interim responses like 100 Continue come before the real one on the same connection
+                if not status.startswith("1") or status == "101":
+                    break
+                statusline = conn.file.readline().decode("utf8")
+        except Exception:
+            CONNECTION_POOL.release(conn)
+            raise
 
         if "set-cookie" in response_headers:
             cookie = response_headers["set-cookie"]
@@ -90,13 +121,46 @@ class URL:
                     params[param.strip().casefold()] = value.casefold()
             COOKIE_JAR[self.host] = (cookie, params)
 
-        assert "transfer-encoding" not in response_headers
-        assert "content-encoding" not in response_headers
-
-        content = response.read()
-        s.close()
-
-        return response_headers, content
+        has_body = not (status.startswith("1") or status in ["204", "304"])
+        body = ResponseBody(conn, response_headers, has_body,
+                            self.keep_alive(version, response_headers))
+
+        if cached and status == "304":
+            list(body)  # no body, hands the connection back to the pool
+            cached = HTTP_CACHE.revalidated(str(self), cached, response_headers)
+            return cached.headers, iter([cached.body])
+        if method == "GET" and HTTP_CACHE.is_storable(status, response_headers):
+            return response_headers, self.store(response_headers, body)
+        return response_headers, body
+
+    # passes the body through and caches it once it was read completely
+    def store(self, headers: dict[str, str], body: Iterator[bytes]) -> Iterator[bytes]:
+        chunks = []
+        for chunk in body:
+            chunks.append(chunk)
+            yield chunk
+        # the cached body is stored decompressed
+        headers = {header: value for header, value in headers.items()
+                   if header not in ["content-encoding", "transfer-encoding", "content-length"]}
+        HTTP_CACHE.put(str(self), headers, b"".join(chunks))
+
+    # "" if a reused connection was closed by the server, errors on a new one are raised
+    @staticmethod
+    def send(conn: Connection, request: str, reused: bool) -> str:
+        try:
+            conn.send(request.encode("utf8"))
+            return conn.file.readline().decode("utf8")
+        except OSError:
+            if not reused:
+                raise
+            return ""
+
+    @staticmethod
+    def keep_alive(version: str, headers: dict[str, str]) -> bool:
+        connection = headers.get("connection", "").casefold()
+        if version == "HTTP/1.0":  # HTTP/1.0 closes unless asked otherwise
+            return connection == "keep-alive"
+        return connection != "close"
 
     def resolve(self, url: str):
         if "://" in url:  # absolute URL
@@ -118,6 +182,11 @@ class URL:
             return URL(self.scheme + "://" + self.host +
                        ":" + str(self.port) + url)
 
+    def read_file(self) -> Iterator[bytes]:
+        with open(self.path, "rb") as file:
+            while chunk := file.read(CHUNK_SIZE):
+                yield chunk
+
     def open_file(self):
         file = open(self.path, "r")
         body = file.read()
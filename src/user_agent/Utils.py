@@ -1,3 +1,6 @@
+import bisect
+
+from src.dom.Traversal import pre_order
 from src.layout.BlockLayout import BlockLayout
 from src.layout.DocumentLayout import DocumentLayout
 from src.layout.InputLayout import InputLayout
@@ -7,15 +10,29 @@ from src.layout.TextLayout import TextLayout
 
 def paint_tree(layout_object: DocumentLayout | BlockLayout | LineLayout | TextLayout | InputLayout,
                display_list: list) -> None:
-    if layout_object.should_paint():
-        display_list.extend(layout_object.paint())
+    for layout_object in pre_order(layout_object):
+        if layout_object.should_paint():
+            display_list.extend(layout_object.paint())
+
 
-    for child in layout_object.children:
-        paint_tree(child, display_list)
+# the front-most layout object at x, y in page coordinates, or None.
+# Lines and blocks are stacked top to bottom and words left to right without overlapping,
+# so at every level one bisect finds the only child that can contain the point
+def hit_test(layout_object, x, y):
+    if not contains(layout_object, x, y):
+        return None
+    while layout_object.children:
+        children = layout_object.children
+        if isinstance(layout_object, LineLayout):
+            i = bisect.bisect_right(children, x, key=lambda child: child.x) - 1
+        else:
+            i = bisect.bisect_right(children, y, key=lambda child: child.y) - 1
+        if i < 0 or not contains(children[i], x, y):
+            break
+        layout_object = children[i]
+    return layout_object
 
 
-def tree_to_list(tree, list):
-    list.append(tree)
-    for child in tree.children:
-        tree_to_list(child, list)
-    return list
+def contains(layout_object, x, y) -> bool:
+    return layout_object.x <= x < layout_object.x + layout_object.width \
+        and layout_object.y <= y < layout_object.y + layout_object.height